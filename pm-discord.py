@@ -1,9 +1,19 @@
 # 필요한 라이브러리를 가져옵니다.
+import asyncio
 import discord
+import functools
+import heapq
+import itertools
+import os
 from discord.ext import commands
 import requests
+import threading
+from collections import OrderedDict, deque
+from requests.adapters import HTTPAdapter
+import time
 from bs4 import BeautifulSoup
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 
 # 명령 접두사와 인텐트가 설정된 디스코드 봇을 만듭니다.
 intents = discord.Intents.default()
@@ -12,6 +22,213 @@ bot = commands.Bot(command_prefix='!', intents=intents)
 # 사용자 인증 정보를 저장할 딕셔너리
 user_credentials = {}
 
+# PLATO 스크랩을 이벤트 루프 밖에서 실행할 봇 전체 작업 풀
+SCRAPE_WORKERS = int(os.environ.get("PLATO_SCRAPE_WORKERS", "8"))
+scrape_executor = ThreadPoolExecutor(max_workers=SCRAPE_WORKERS, thread_name_prefix="plato-scrape")
+
+# 모든 사용자 세션이 같이 쓰는 연결 풀 (쿠키는 세션마다 따로 보관)
+http_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=SCRAPE_WORKERS * 4)
+
+# 공유 연결 풀을 쓰는 세션을 만드는 함수
+def create_session():
+    session = requests.Session()
+    session.mount("https://", http_adapter)
+    return session
+
+# 스크랩이 진행 중인 사용자 id (사용자당 한 번에 하나의 작업만 허용)
+active_users = set()
+
+# 블로킹 함수를 작업 풀에서 실행하고 결과를 기다리는 함수
+async def run_blocking(func, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(scrape_executor, functools.partial(func, *args))
+
+# 디스코드 메시지 한 개의 최대 글자 수
+DISCORD_MESSAGE_LIMIT = 2000
+
+# 채널마다 CHANNEL_RATE_PER 초 동안 보낼 수 있는 메시지(전송/수정) 수
+CHANNEL_RATE = int(os.environ.get("DISCORD_CHANNEL_RATE", "5"))
+CHANNEL_RATE_PER = float(os.environ.get("DISCORD_CHANNEL_RATE_PER", "5"))
+
+# 채널별 전송 한도를 모든 사용자가 같이 쓰도록 관리하는 클래스 (한도를 넘으면 순서대로 기다립니다)
+class ChannelRateLimiter:
+    def __init__(self, rate, per):
+        self.rate = rate
+        self.per = per
+        self._sent = {}
+        self._locks = {}
+
+    async def acquire(self, channel_id):
+        lock = self._locks.setdefault(channel_id, asyncio.Lock())
+        async with lock:
+            sent = self._sent.setdefault(channel_id, deque())
+            now = time.monotonic()
+            while sent and now - sent[0] >= self.per:
+                sent.popleft()
+            if len(sent) >= self.rate:
+                await asyncio.sleep(self.per - (now - sent[0]))
+                sent.popleft()
+            sent.append(time.monotonic())
+
+channel_limiter = ChannelRateLimiter(CHANNEL_RATE, CHANNEL_RATE_PER)
+
+# 채널 전송 한도 안에서 메시지를 보내는 함수
+async def send_limited(channel, content):
+    await channel_limiter.acquire(channel.id)
+    return await channel.send(content)
+
+# 채널 전송 한도 안에서 메시지를 수정하는 함수
+async def edit_limited(message, content):
+    await channel_limiter.acquire(message.channel.id)
+    return await message.edit(content=content)
+
+# 여러 글 덩어리를 디스코드 글자 수 제한 안에서 가능한 적은 메시지로 묶는 함수
+def pack_messages(blocks, limit=DISCORD_MESSAGE_LIMIT):
+    messages = []
+    current = ""
+    for block in blocks:
+        # 한 덩어리가 제한보다 길면 줄 단위로, 한 줄이 제한보다 길면 제한 길이로 나눕니다.
+        parts = [block]
+        if len(block) > limit:
+            parts = [
+                line[start:start + limit]
+                for line in block.split("\n")
+                for start in range(0, max(len(line), 1), limit)
+            ]
+        for part in parts:
+            candidate = f"{current}\n{part}" if current else part
+            if len(candidate) <= limit:
+                current = candidate
+            else:
+                messages.append(current)
+                current = part
+    if current:
+        messages.append(current)
+    return messages
+
+# 진행 상황을 메시지 하나에 계속 수정해서 보여주는 클래스
+class ProgressMessage:
+    def __init__(self, channel):
+        self.channel = channel
+        self.message = None
+
+    async def update(self, content):
+        if self.message is None:
+            self.message = await send_limited(self.channel, content)
+        elif self.message.content != content:
+            self.message = await edit_limited(self.message, content)
+
+# 마감 알림을 보낼 시점 (마감 몇 시간 전인지, 쉼표로 구분)
+REMINDER_OFFSETS = sorted(
+    (timedelta(hours=float(hours)) for hours in os.environ.get("PLATO_REMINDER_HOURS", "24,1").split(",")),
+    reverse=True,
+)
+
+# 마감 알림을 신청한 사용자 id 와 알림을 보낼 채널 id
+reminder_channels = {}
+
+# 사용자별로 알림을 예약한 자료 {사용자 id: {(강좌 id, 종류, 제목): (마감일시, 과목명, 예약 번호)}}
+user_deadlines = {}
+
+# 다가오는 알림의 최소 힙 [(알림 시각, 순번, 사용자 id, 자료 키, 예약 번호)]
+# 자료가 바뀌거나 사라지면 힙에서 지우지 않고, 꺼낼 때 user_deadlines 와 비교해 버립니다.
+reminder_heap = []
+reminder_sequence = itertools.count()
+
+# 더 이른 알림이 추가되면 대기 중인 알림 작업을 깨웁니다.
+reminder_wakeup = asyncio.Event()
+reminder_task = None
+
+# 스크랩 결과에서 마감일이 있는 퀴즈와 과제를 (자료 키, 마감일시, 과목명) 으로 모으는 함수
+def collect_deadlines(courses):
+    deadlines = {}
+    for course in courses:
+        for kind, materials in (("quiz", course.quizzes), ("homework", course.homeworks)):
+            for material in materials:
+                if material.due is not None:
+                    deadlines[(course.course_id, kind, material.title)] = (material.due, course.course_name)
+    return deadlines
+
+# 새 스크랩 결과로 사용자의 알림을 갱신하는 함수 (새로 생기거나 마감일이 바뀐 자료만 힙에 추가합니다)
+def update_reminders(user_id, courses):
+    now = datetime.now()
+    previous = user_deadlines.get(user_id, {})
+    deadlines = {}
+
+    earliest = reminder_heap[0][0] if reminder_heap else None
+    for item_key, (due, course_name) in collect_deadlines(courses).items():
+        if due <= now:
+            continue
+        if item_key in previous and previous[item_key][0] == due:
+            deadlines[item_key] = previous[item_key]
+            continue
+
+        version = next(reminder_sequence)
+        deadlines[item_key] = (due, course_name, version)
+        upcoming = [offset for offset in REMINDER_OFFSETS if due - offset > now]
+        passed = [offset for offset in REMINDER_OFFSETS if due - offset <= now]
+        # 이미 지난 알림 시점은 가장 가까운 하나만 바로 보냅니다.
+        if passed:
+            upcoming.append(min(passed))
+        for offset in upcoming:
+            fire_at = max(due - offset, now)
+            heapq.heappush(reminder_heap, (fire_at, next(reminder_sequence), user_id, item_key, version))
+
+    user_deadlines[user_id] = deadlines
+    if reminder_heap and (earliest is None or reminder_heap[0][0] < earliest):
+        reminder_wakeup.set()
+
+# 알림 신청을 취소한 사용자의 알림을 지우는 함수 (힙에 남은 항목은 꺼낼 때 버립니다)
+def clear_reminders(user_id):
+    reminder_channels.pop(user_id, None)
+    user_deadlines.pop(user_id, None)
+
+# 힙에서 꺼낸 알림이 아직 유효한지 확인하는 함수
+def is_current_reminder(user_id, item_key, version):
+    deadline = user_deadlines.get(user_id, {}).get(item_key)
+    return user_id in reminder_channels and deadline is not None and deadline[2] == version
+
+# 가장 이른 알림 시각까지 잠들었다가 알림을 보내는 작업 (사용자 수가 아니라 알림 수만큼만 깨어납니다)
+async def run_reminders():
+    while True:
+        reminder_wakeup.clear()
+        if not reminder_heap:
+            await reminder_wakeup.wait()
+            continue
+
+        delay = (reminder_heap[0][0] - datetime.now()).total_seconds()
+        if delay > 0:
+            try:
+                await asyncio.wait_for(reminder_wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            continue
+
+        fire_at, _, user_id, item_key, version = heapq.heappop(reminder_heap)
+        if not is_current_reminder(user_id, item_key, version):
+            continue
+        due, course_name, _ = user_deadlines[user_id][item_key]
+        await send_reminder(user_id, item_key, due, course_name)
+
+# 마감 알림 메시지를 보내는 함수
+async def send_reminder(user_id, item_key, due, course_name):
+    channel = bot.get_channel(reminder_channels[user_id])
+    if channel is None:
+        return
+
+    course_id, kind, title = item_key
+    remaining = due - datetime.now()
+    hours = max(0, int(remaining.total_seconds() // 3600))
+    label = "Quiz" if kind == "quiz" else "Homework"
+    try:
+        await send_limited(
+            channel,
+            f"<@{user_id}> [{label}] {course_name} - {title} 마감까지 {hours}시간 남았습니다. "
+            f"(마감: {due:%Y-%m-%d %H:%M})"
+        )
+    except discord.DiscordException as e:
+        print(f"마감 알림을 보내는 중 오류 발생: {str(e)}")
+
 # 강좌를 나타내는 클래스
 class Course:
     def __init__(self, course_id, course_name):
@@ -34,7 +251,9 @@ def login(session, username, password):
         "password": password
     }
     plato_url = "https://plato.pusan.ac.kr/"
-    res = session.post(f"{plato_url}login/index.php", login_info, verify=False)
+    res = session.post(f"{plato_url}login/index.php", login_info)
+    # 사용자별 결과 캐시에 쓰기 위해 로그인한 학번을 세션에 기록합니다.
+    session.plato_username = username
     return res.url == plato_url
 
 # 강좌 목록을 파싱하는 함수
@@ -61,32 +280,87 @@ def parse_datetime_string(text):
         print(f"오류 상세 내용: {str(e)}")
         return None
 
+# 퀴즈 상세 페이지를 동시에 요청할 최대 개수
+QUIZ_DETAIL_CONCURRENCY = 4
+
+# 퀴즈 상세 페이지에서 읽은 결과를 다시 쓰는 시간(초)
+QUIZ_DETAIL_TTL = 60 * 60
+
+# 상세 페이지 결과 캐시에 남겨둘 최대 항목 수
+QUIZ_DETAIL_CACHE_SIZE = 5000
+
+# 상세 페이지 결과 캐시 {(학번, 퀴즈 id): (응시 가능 여부, 마감일시, 저장 시각)}
+# 응시 가능 여부는 사용자마다 다르므로 사용자별로 따로 저장합니다.
+# 저장한 순서대로 유지해서 저장할 때마다 만료된 항목과 최대 개수를 넘는 오래된 항목을 지웁니다.
+quiz_details = OrderedDict()
+quiz_details_lock = threading.Lock()
+
+# 퀴즈 상세 페이지에서 응시 가능 여부와 종료일시를 읽는 함수
+def get_quiz_detail(session, quiz_id):
+    cache_key = (session.plato_username, quiz_id)
+    with quiz_details_lock:
+        cached = quiz_details.get(cache_key)
+    if cached and time.monotonic() - cached[2] < QUIZ_DETAIL_TTL:
+        return cached[0], cached[1]
+
+    quizRes = session.get(f"https://plato.pusan.ac.kr/mod/quiz/view.php?id={quiz_id}")
+    quizSoup = BeautifulSoup(quizRes.text, "html.parser")
+
+    # 응시가 끝난 퀴즈는 본문에 안내 문구(h3)가 표시됩니다.
+    check = quizSoup.select_one("div[role=main] > h3")
+    due = None
+    if not check:
+        infos = [p.get_text().strip() for p in quizSoup.select(".quizinfo > p")]
+        due_list = [info[7:] for info in infos if info.startswith("종료일시 : ")]
+        if len(due_list) > 0:
+            due = parse_datetime_string(due_list[0])
+
+    now = time.monotonic()
+    with quiz_details_lock:
+        quiz_details[cache_key] = (not check, due, now)
+        quiz_details.move_to_end(cache_key)
+        while quiz_details:
+            oldest = next(iter(quiz_details.values()))
+            if now - oldest[2] < QUIZ_DETAIL_TTL and len(quiz_details) <= QUIZ_DETAIL_CACHE_SIZE:
+                break
+            quiz_details.popitem(last=False)
+    return not check, due
+
 # 특정 강좌의 퀴즈 정보를 가져오는 함수
 def get_quizzes(session, course_id):
-    quizzes = []
     res = session.get(f"https://plato.pusan.ac.kr/mod/quiz/index.php?id={course_id}")
     soup = BeautifulSoup(res.text, "html.parser")
 
+    candidates = []
     for tr in soup.select(".generaltable > tbody > tr"):
         aTag = tr.select_one("td > a")
-        href = aTag['href']
+        if aTag is None:
+            continue
+        quiz_id = aTag['href'].split("?id=")[-1]
         title = aTag.get_text().strip()
-        link = "https://plato.pusan.ac.kr/mod/quiz/" + href
 
-        quizRes = session.get(link)
-        quizSoup = BeautifulSoup(quizRes.text, "html.parser")
+        # 목록에서 이미 마감되었거나 점수가 있는(응시한) 퀴즈는 상세 페이지를 요청하지 않습니다.
+        tds = tr.select("td")
+        if len(tds) >= 4:
+            index_due = parse_datetime_string(tds[2].get_text().strip())
+            if index_due is not None and index_due <= datetime.now():
+                continue
+            if tds[3].get_text().strip() != "":
+                continue
+
+        candidates.append((quiz_id, title))
 
-        check = quizSoup.select_one("div[role=main] > h3")
+    if not candidates:
+        return []
 
-        if not check:
-            infos = [p.get_text().strip() for p in quizSoup.select(".quizinfo > p")]
-            due_list = [info[7:] for info in infos if info.startswith("종료일시 : ")]
-            if len(due_list) > 0:
-                due_string = due_list[0]
-                due = parse_datetime_string(due_string)
+    # 남은 퀴즈의 상세 페이지는 동시에 요청합니다.
+    with ThreadPoolExecutor(max_workers=min(QUIZ_DETAIL_CONCURRENCY, len(candidates))) as executor:
+        details = list(executor.map(lambda candidate: get_quiz_detail(session, candidate[0]), candidates))
 
-            if (due is None or datetime.now() < due):
-                quizzes.append(CourseMaterial(title, due))
+    quizzes = []
+    for (quiz_id, title), (available, due) in zip(candidates, details):
+        if available and (due is None or datetime.now() < due):
+            quizzes.append(CourseMaterial(title, due))
 
     return quizzes
 
@@ -134,54 +408,93 @@ def parse_courses_materials(session, courses):
         course.videos = get_videos(session, course.course_id)
         course.homeworks = get_homeworks(session, course.course_id)
 
+# 봇이 준비되면 마감 알림 작업을 시작합니다.
+@bot.event
+async def on_ready():
+    global reminder_task
+    if reminder_task is None:
+        reminder_task = asyncio.create_task(run_reminders())
+
+# 디스코드 명령어로 마감 알림을 신청하거나 취소하는 함수 (!remind on / !remind off)
+@bot.command(name='remind')
+async def set_reminder(ctx, mode="on"):
+    if mode == "off":
+        clear_reminders(ctx.author.id)
+        await send_limited(ctx.channel, "마감 알림을 취소했습니다.")
+        return
+
+    reminder_channels[ctx.author.id] = ctx.channel.id
+    hours = ", ".join(f"{offset.total_seconds() / 3600:g}" for offset in REMINDER_OFFSETS)
+    await send_limited(ctx.channel, f"마감 알림을 신청했습니다. !plato 로 불러온 퀴즈와 과제의 마감 {hours}시간 전에 알려드립니다.")
+
 # 디스코드 명령어로 PLATO 정보를 가져오는 함수
 @bot.command(name='plato')
 async def get_plato_info(ctx):
-    await ctx.send("PLATO 정보를 가져오기 위해 아이디와 비밀번호를 입력해주세요.")
+    if ctx.author.id in active_users:
+        await send_limited(ctx.channel, "이전 요청을 처리하는 중입니다. 잠시 후 다시 시도해주세요.")
+        return
 
+    active_users.add(ctx.author.id)
+    try:
+        await send_plato_info(ctx)
+    finally:
+        active_users.discard(ctx.author.id)
+
+# PLATO 정보를 가져와 출력하는 함수 (스크랩은 작업 풀에서 실행합니다)
+# 진행 상황은 메시지 하나를 수정해서 보여주고, 결과는 가능한 적은 메시지로 묶어서 보냅니다.
+async def send_plato_info(ctx):
     # 디스코드 채팅에서 사용자의 아이디와 비밀번호를 받습니다.
     def check(message):
         return message.author == ctx.author and message.channel == ctx.channel
 
     try:
-        await ctx.send("PLATO 아이디를 입력하세요.")
+        await send_limited(ctx.channel, "PLATO 정보를 가져오기 위해 아이디와 비밀번호를 입력해주세요.\nPLATO 아이디를 입력하세요.")
         username_message = await bot.wait_for("message", check=check, timeout=30)
         username = username_message.content
 
-        await ctx.send("PLATO 비밀번호를 입력하세요.")
+        await send_limited(ctx.channel, "PLATO 비밀번호를 입력하세요.")
         password_message = await bot.wait_for("message", check=check, timeout=30)
         password = password_message.content
     except TimeoutError:
-        await ctx.send("입력 시간이 초과되었습니다.")
+        await send_limited(ctx.channel, "입력 시간이 초과되었습니다.")
         return
 
     # 사용자별로 아이디와 비밀번호를 저장합니다.
     user_credentials[ctx.author.id] = {"username": username, "password": password}
 
-    await ctx.send("로그인 중...")
+    progress = ProgressMessage(ctx.channel)
+    await progress.update("로그인 중...")
 
     # 세션을 생성하고 로그인을 수행합니다.
-    session = requests.Session()
+    session = create_session()
     credentials = user_credentials.get(ctx.author.id, {})
-    if not login(session, credentials.get("username", ""), credentials.get("password", "")):
-        await ctx.send("로그인에 실패했습니다.")
+    if not await run_blocking(login, session, credentials.get("username", ""), credentials.get("password", "")):
+        await progress.update("로그인에 실패했습니다.")
         return
 
-    await ctx.send("로그인에 성공했습니다. 강좌 목록을 불러오는 중...")
+    await progress.update("로그인에 성공했습니다. 강좌 목록을 불러오는 중...")
 
     # 강좌 목록을 가져옵니다.
-    courses = parse_courses_entry(session)
+    courses = await run_blocking(parse_courses_entry, session)
 
     if not courses:
-        await ctx.send("강좌 목록이 없습니다.")
+        await progress.update("강좌 목록이 없습니다.")
         return
 
-    await ctx.send("강좌 목록을 성공적으로 불러왔습니다. 학습 자료를 불러오는 중...")
+    await progress.update("강좌 목록을 성공적으로 불러왔습니다. 학습 자료를 불러오는 중...")
 
     # 강좌 자료를 가져옵니다.
-    parse_courses_materials(session, courses)
+    await run_blocking(parse_courses_materials, session, courses)
+
+    # 마감 알림을 신청한 사용자는 새 결과로 알림을 다시 예약합니다.
+    if ctx.author.id in reminder_channels:
+        update_reminders(ctx.author.id, courses)
+
+    await progress.update("학습 자료를 모두 불러왔습니다.")
 
-    # 결과를 출력합니다.
+    # 결과를 과목별 글 덩어리로 만듭니다. (남은 기한은 같은 현재 시각을 기준으로 계산합니다)
+    now = datetime.now()
+    blocks = []
     for course in courses:
         course_info = f"---------- 과목: {course.course_name} ----------\n"
 
@@ -191,7 +504,7 @@ async def get_plato_info(ctx):
             for quiz in course.quizzes:
                 # 마감까지 남은 기한을 계산합니다.
                 if quiz.due:
-                    remaining_days = (quiz.due - datetime.now()).days
+                    remaining_days = (quiz.due - now).days
                     course_info += f"{quiz.title} - 마감까지 {remaining_days}일 남음\n"
                 else:
                     course_info += f"{quiz.title}\n"
@@ -206,16 +519,18 @@ async def get_plato_info(ctx):
             for homework in course.homeworks:
                 # 마감까지 남은 기한을 계산합니다.
                 if homework.due:
-                    remaining_days = (homework.due - datetime.now()).days
+                    remaining_days = (homework.due - now).days
                     course_info += f"{homework.title} - 마감까지 {remaining_days}일 남음\n"
                 else:
                     course_info += f"{homework.title}\n"
 
         # 해당 정보가 있는 경우에만 결과에 추가합니다.
         if any([course.quizzes, course.videos, course.homeworks]):
-            await ctx.send(course_info)
+            blocks.append(course_info)
 
-    await ctx.send("\n화이팅٩( ᐛ )و")
+    blocks.append("화이팅٩( ᐛ )و")
+    for message in pack_messages(blocks):
+        await send_limited(ctx.channel, message)
 
 # 봇을 제공된 토큰으로 실행합니다.
 bot.run('토큰')
\ No newline at end of file
@@ -1,3 +1,27 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import PlatoUser, PlatoCourse, PlatoMaterial, ScrapeJob
+
+
+@admin.register(PlatoUser)
+class PlatoUserAdmin(admin.ModelAdmin):
+    list_display = ("username", "refreshed_at", "revision")
+    exclude = ("credential_key",)
+
+
+@admin.register(PlatoCourse)
+class PlatoCourseAdmin(admin.ModelAdmin):
+    list_display = ("course_name", "course_id", "user")
+
+
+@admin.register(PlatoMaterial)
+class PlatoMaterialAdmin(admin.ModelAdmin):
+    list_display = ("title", "kind", "due", "course", "user")
+    list_filter = ("kind",)
+
+
+@admin.register(ScrapeJob)
+class ScrapeJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "username", "status", "created_at", "finished_at")
+    list_filter = ("status",)
+    exclude = ("credential_key", "body")
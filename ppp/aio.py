@@ -0,0 +1,243 @@
+import asyncio
+import httpx
+import time
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views import View
+
+from .api import (
+    plato_url, LOGIN_PATH, MATERIAL_PAGES,
+    session_cache, credential_key, is_login_page,
+    parse_course_list, page_key, page_cache, parse_page, select_courses, store_result,
+    ScrapeParams, invalid_selection_response, login_failed_response, changes_response, cached_response,
+    submit_job, stream_response, stored_response, scraped_response,
+)
+from .governor import governor
+from .metrics import Trace, metrics, page_type, timed
+from .singleflight import singleflight
+from .transport import create_async_transport, get_async_transport
+
+
+# PLATO 시스템 로그인
+async def login(client, username, password):
+    login_info = {
+        "username": username,
+        "password": password
+    }
+    res = await client.post(plato_url(LOGIN_PATH), data=login_info)
+    return str(res.url) == plato_url()
+
+
+# 비동기 HTTP 클라이언트 (api.PlatoSession 과 같은 역할)
+# shared_transport 가 False 면 클라이언트 전용 전송 계층을 만들고 aclose() 에서 닫음
+class PlatoClient(httpx.AsyncClient):
+    def __init__(self, username, password, shared_transport=True):
+        self.shared_transport = shared_transport
+        super().__init__(
+            transport=get_async_transport() if shared_transport else create_async_transport(),
+            follow_redirects=True,
+            timeout=getattr(settings, "PLATO_REQUEST_TIMEOUT", 15),
+        )
+        self.username = username
+        self.password = password
+        self.login_generation = 0
+        self._login_lock = asyncio.Lock()
+        self.trace = None
+
+    # 공유 전송 계층(연결 풀)은 다른 클라이언트와 같이 쓰므로 닫지 않음
+    async def aclose(self):
+        if not self.shared_transport:
+            await super().aclose()
+
+    async def relogin(self):
+        with timed(self.trace, "login"):
+            if not await login(self, self.username, self.password):
+                session_cache.delete(credential_key(self.username, self.password))
+                return False
+        self.login_generation += 1
+        session_cache.set(credential_key(self.username, self.password), dict(self.cookies))
+        return True
+
+    # 요청마다 소요 시간, 응답 크기, 상태 코드를 기록
+    # 모든 요청은 전역 조절기(governor)를 거쳐 속도 제한과 재시도를 적용
+    async def send_timed(self, method, url, *args, **kwargs):
+        started = time.perf_counter()
+        res = await governor.call_async(
+            lambda: httpx.AsyncClient.request(self, method, url, *args, **kwargs),
+            (httpx.TransportError,),
+        )
+        duration_ms = (time.perf_counter() - started) * 1000
+        metrics.observe_request(url, duration_ms, len(res.content), res.status_code)
+        if self.trace is not None:
+            self.trace.add(f"fetch_{page_type(url)}", duration_ms)
+        return res
+
+    async def request(self, method, url, *args, **kwargs):
+        generation = self.login_generation
+        res = await self.send_timed(method, url, *args, **kwargs)
+        if str(url) != plato_url(LOGIN_PATH) and is_login_page(res):
+            async with self._login_lock:
+                # 다른 요청이 이미 다시 로그인했다면 로그인 요청을 생략
+                relogged = generation != self.login_generation or await self.relogin()
+            if relogged:
+                res = await self.send_timed(method, url, *args, **kwargs)
+        return res
+
+
+# 캐시된 쿠키가 있으면 로그인 없이, 없으면 로그인해서 클라이언트 생성 (실패 시 None)
+async def open_client(username, password, trace=None, shared_transport=True):
+    client = PlatoClient(username, password, shared_transport)
+    client.trace = trace
+    cookies = session_cache.get(credential_key(username, password))
+    if cookies:
+        client.cookies.update(cookies)
+        return client
+    if not await client.relogin():
+        await client.aclose()
+        return None
+    return client
+
+
+# 강좌 목록 파싱
+async def parse_courses_entry(client):
+    res = await client.get(plato_url())
+    with timed(client.trace, "parse_main"):
+        return parse_course_list(res.text)
+
+
+# 조건부 요청으로 페이지 요청 (api.fetch_page 와 같음)
+async def fetch_page(client, url, key):
+    entry = page_cache.get(key)
+    res = await client.get(url, headers=entry[1] if entry is not None else {})
+    if res.status_code == 304 and entry is None:
+        res = await client.get(url)
+    return res, entry
+
+
+# 강좌 자료 파싱 (api.get_materials 와 같음)
+async def get_materials(client, course_id, kind):
+    path, phase = MATERIAL_PAGES[kind]
+    key = page_key(client, course_id, kind)
+    res, entry = await fetch_page(client, plato_url(path.format(course_id)), key)
+    return parse_page(key, res, entry, client.trace, phase)
+
+
+# 강좌별 페이지를 한 번에 요청하되 동시에 진행되는 요청 수는 max_workers 로 제한
+# 페이지별/전체 시간을 넘기거나 실패한 페이지는 course.missing 에 표시하고 나머지 결과만 사용
+async def parse_courses_materials(client, courses, max_workers=1, types=None):
+    semaphore = asyncio.Semaphore(max(1, max_workers))
+    budget = getattr(settings, "PLATO_SCRAPE_BUDGET", 20)
+    page_budget = getattr(settings, "PLATO_PAGE_BUDGET", 10)
+
+    async def run(course, attr):
+        async with semaphore:
+            try:
+                materials = await asyncio.wait_for(get_materials(client, course.course_id, attr), page_budget)
+                setattr(course, attr, materials)
+            except Exception:
+                course.missing.append(attr)
+
+    for course in courses:
+        course.missing = []
+    # 결과는 강좌 객체에 바로 넣으므로 강좌 순서가 유지됨
+    tasks = {
+        asyncio.ensure_future(run(course, attr)): (course, attr)
+        for course in courses for attr in MATERIAL_PAGES
+        if types is None or attr in types
+    }
+    if not tasks:
+        return
+    _, pending = await asyncio.wait(tasks, timeout=budget)
+    for task in pending:
+        task.cancel()
+        course, attr = tasks[task]
+        course.missing.append(attr)
+
+
+# 동기 이터레이터를 작업 스레드에서 한 항목씩 꺼내는 비동기 이터레이터
+async def iterate_in_thread(iterable):
+    iterator = iter(iterable)
+    done = object()
+    while True:
+        item = await sync_to_async(next, thread_sensitive=False)(iterator, done)
+        if item is done:
+            return
+        yield item
+
+
+# ASGI 로 서빙할 때 워커를 점유하지 않는 비동기 뷰
+class AsyncTestView(View):
+    async def get(self, request):
+        # 단계별 소요 시간을 Server-Timing 헤더로 전달
+        trace = Trace()
+        with trace.phase("total"):
+            response = await self.respond(request, trace)
+        response["Server-Timing"] = trace.server_timing()
+        # ASGI 서버에서는 동기 스트림을 한꺼번에 모으지 않고 작업 스레드에서 하나씩 꺼내 보냄
+        if isinstance(response, StreamingHttpResponse) and isinstance(request, ASGIRequest) and not response.is_async:
+            response.streaming_content = iterate_in_thread(response.streaming_content)
+        return response
+
+    # 응답 흐름은 api.TestView.respond 와 같고, 스크랩만 비동기 클라이언트로 함
+    # DB 를 쓰는 부분과 stream/job 모드는 api 의 동기 함수를 작업 스레드에서 실행
+    async def respond(self, request, trace):
+        try:
+            try:
+                params = ScrapeParams(request.GET)
+            except ValueError as e:
+                return invalid_selection_response(e)
+
+            if params.since is not None:
+                if params.changes_need_scrape and await self.scrape(request, trace, params) is None:
+                    return login_failed_response()
+                return await sync_to_async(changes_response)(request, trace, params)
+
+            response = cached_response(request, trace, params)
+            if response is not None:
+                return response
+            if params.mode == 'job':
+                return await sync_to_async(submit_job)(params)
+            if params.stream_format:
+                return await sync_to_async(stream_response, thread_sensitive=False)(trace, params)
+            if params.source == 'db':
+                response = await sync_to_async(stored_response)(request, trace, params)
+                if response is not None:
+                    return response
+            return scraped_response(request, params, await self.scrape(request, trace, params))
+        except Exception as e:
+            return JsonResponse({"error": "내부 서버 오류", "details": str(e)}, status=500)
+
+    # 스크랩해서 저장하고 (본문, ETag) 반환 (로그인 실패 시 None)
+    # 같은 범위의 동시 요청은 api.scrape_and_store 와 같은 single-flight 로 합침
+    # (잠금 대기는 작업 스레드에서 하고, 스크랩 코루틴은 async_to_sync 로 이 이벤트 루프에서 실행)
+    async def scrape(self, request, trace, params):
+        def run():
+            return async_to_sync(self.scrape_once)(request, trace, params)
+
+        with trace.phase("scrape"):
+            return await sync_to_async(singleflight.do, thread_sensitive=False)(params.cache_key, run)
+
+    async def scrape_once(self, request, trace, params):
+        # ASGI 서버에서는 이벤트 루프가 유지되므로 전송 계층을 공유하고,
+        # WSGI 에서 async_to_sync 로 실행될 때는 요청마다 루프가 새로 생기므로 요청이 끝나면 닫음
+        shared = isinstance(request, ASGIRequest)
+        client = await open_client(params.username, params.password, trace, shared_transport=shared)
+        if client is None:
+            return None
+
+        try:
+            with trace.phase("courses"):
+                courses = select_courses(await parse_courses_entry(client), params.selection)
+            with trace.phase("materials"):
+                await parse_courses_materials(
+                    client, courses, max_workers=params.concurrency, types=params.selection[0]
+                )
+        finally:
+            await client.aclose()
+
+        with trace.phase("store"):
+            return await sync_to_async(store_result)(
+                params.username, params.key, courses, params.ttl, params.selection
+            )
@@ -1,25 +1,74 @@
+import functools
+import hashlib
+import json
+import math
 import requests
-from bs4 import BeautifulSoup
-from datetime import datetime
-from django.http import JsonResponse
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare, salted_hmac
+from django.utils.http import parse_etags
 from rest_framework.views import APIView
 
+from .cache import TTLCache
+from .encoding import MSGPACK_CONTENT_TYPES, accepts_msgpack, dumps_json, to_msgpack
+from .governor import governor
+from .jobs import job_queue
+from .metrics import Trace, metrics, page_type, timed
+from .parsers import (
+    CourseMaterial, open_materials, parse_course_list, parse_quizzes, parse_videos, parse_homeworks,
+)
+from .scheduler import refresh_scheduler
+from .singleflight import singleflight
+from .transport import configure_session
+from .store import load_changes, load_courses, load_due, save_courses
 
-# 강좌 클래스
-class Course:
-    def __init__(self, course_id, course_name):
-        self.course_id = course_id
-        self.course_name = course_name
-        self.quizzes = []
-        self.videos = []
-        self.homeworks = []
 
+LOGIN_PATH = "login/index.php"
+QUIZ_INDEX_PATH = "mod/quiz/index.php?id={}"
+VIDEO_PROGRESS_PATH = "report/ubcompletion/user_progress_a.php?id={}"
+HOMEWORK_INDEX_PATH = "mod/assign/index.php?id={}"
 
-# 강좌 자료 클래스
-class CourseMaterial:
-    def __init__(self, title, due):
-        self.title = title
-        self.due = due
+
+# PLATO 주소 (설정의 PLATO_URL 을 기준으로 만들어 테스트/벤치마크에서 바꿀 수 있음)
+def plato_url(path=""):
+    return getattr(settings, "PLATO_URL", "https://plato.pusan.ac.kr/") + path
+
+# 로그인된 세션 쿠키 캐시 (사용자별)
+session_cache = TTLCache(
+    getattr(settings, "PLATO_SESSION_CACHE_SIZE", 1000),
+    getattr(settings, "PLATO_SESSION_TTL", 30 * 60),
+)
+
+# 사용자별 응답 결과 캐시 (JSON 본문과 ETag)
+result_cache = TTLCache(
+    getattr(settings, "PLATO_RESULT_CACHE_SIZE", 1000),
+    getattr(settings, "PLATO_RESULT_TTL", 5 * 60),
+)
+
+
+# 강좌 페이지별 원본 HTML 해시와 파싱 결과 캐시 (사용자, 강좌 id, 자료 종류별)
+# 값은 (HTML 해시, 조건부 요청 헤더, CourseMaterial 튜플)
+# 마감일시 필터는 읽을 때마다 적용하도록 마감이 지난 자료도 포함해서 저장
+page_cache = TTLCache(
+    getattr(settings, "PLATO_PAGE_CACHE_SIZE", 5000),
+    getattr(settings, "PLATO_PAGE_CACHE_TTL", 24 * 60 * 60),
+)
+
+
+# 캐시 키와 저장소 인증에 쓸 아이디/비밀번호 해시
+def credential_key(username, password):
+    return salted_hmac("ppp.credential_key", f"{username}\0{password}", algorithm="sha256").hexdigest()
+
+
+# 세션이 만료되어 로그인 페이지로 튕겨졌는지 확인
+def is_login_page(res):
+    return str(res.url).startswith(plato_url(LOGIN_PATH))
 
 
 # PLATO 시스템 로그인
@@ -28,131 +77,826 @@ def login(session, username, password):
         "username": username,
         "password": password
     }
-    plato_url = "https://plato.pusan.ac.kr/"
-    res = session.post(f"{plato_url}login/index.php", login_info, verify=False)
-    return res.url == plato_url
+    res = session.post(plato_url(LOGIN_PATH), login_info)
+    return res.url == plato_url()
+
+
+# 로그인이 풀리면 다시 로그인한 뒤 같은 요청을 한 번 더 보내는 세션
+class PlatoSession(requests.Session):
+    def __init__(self, username, password):
+        super().__init__()
+        configure_session(self)
+        self.username = username
+        self.password = password
+        self.login_generation = 0
+        self._login_lock = threading.Lock()
+        self.trace = None
+
+    def relogin(self):
+        with timed(self.trace, "login"):
+            if not login(self, self.username, self.password):
+                session_cache.delete(credential_key(self.username, self.password))
+                return False
+        self.login_generation += 1
+        session_cache.set(credential_key(self.username, self.password), self.cookies.get_dict())
+        return True
+
+    # 요청마다 소요 시간, 응답 크기, 상태 코드를 기록
+    # 모든 요청은 전역 조절기(governor)를 거쳐 속도 제한과 재시도를 적용
+    def send_timed(self, method, url, *args, **kwargs):
+        kwargs.setdefault("timeout", getattr(settings, "PLATO_REQUEST_TIMEOUT", 15))
+        started = time.perf_counter()
+        res = governor.call(
+            functools.partial(requests.Session.request, self, method, url, *args, **kwargs),
+            (requests.ConnectionError, requests.Timeout),
+        )
+        duration_ms = (time.perf_counter() - started) * 1000
+        metrics.observe_request(url, duration_ms, len(res.content), res.status_code)
+        if self.trace is not None:
+            self.trace.add(f"fetch_{page_type(url)}", duration_ms)
+        return res
+
+    def request(self, method, url, *args, **kwargs):
+        generation = self.login_generation
+        res = self.send_timed(method, url, *args, **kwargs)
+        if url != plato_url(LOGIN_PATH) and is_login_page(res):
+            with self._login_lock:
+                # 다른 스레드가 이미 다시 로그인했다면 로그인 요청을 생략
+                relogged = generation != self.login_generation or self.relogin()
+            if relogged:
+                res = self.send_timed(method, url, *args, **kwargs)
+        return res
+
+
+# 캐시된 쿠키가 있으면 로그인 없이, 없으면 로그인해서 세션 생성 (실패 시 None)
+def open_session(username, password, trace=None):
+    session = PlatoSession(username, password)
+    session.trace = trace
+    cookies = session_cache.get(credential_key(username, password))
+    if cookies:
+        session.cookies.update(cookies)
+        return session
+    if not session.relogin():
+        return None
+    return session
 
 
 # 강좌 목록 파싱
 def parse_courses_entry(session):
-    plato_url = "https://plato.pusan.ac.kr/"
-    res = session.get(plato_url)
-    soup = BeautifulSoup(res.text, "html.parser")
-    courses = []
-    for course in soup.select(".course-link"):
-        course_id = course["href"].split("?id=")[-1]
-        course_name = course.select_one(".course-title > h3").text
-        courses.append(Course(course_id, course_name))
+    res = session.get(plato_url())
+    with timed(getattr(session, "trace", None), "parse_main"):
+        return parse_course_list(res.text)
+
+
+# 페이지 캐시 키
+def page_key(session, course_id, kind):
+    return getattr(session, "username", None), course_id, kind
+
+
+# 마감일시로 거르지 않은 파싱 함수 (페이지 캐시에 저장할 결과용)
+PAGE_PARSERS = {
+    "quizzes": functools.partial(parse_quizzes, now=datetime.min),
+    "videos": parse_videos,
+    "homeworks": functools.partial(parse_homeworks, now=datetime.min),
+}
+
+
+# 지난번 응답에 ETag/Last-Modified 가 있었다면 조건부 요청 헤더로 다시 보냄
+# 캐시 항목이 없는데 304 가 오면 (본문이 없으므로) 조건부 헤더 없이 다시 요청
+# 요청에 쓴 캐시 항목을 함께 반환하므로 그 사이에 만료되어도 parse_page 에서 재사용 가능
+def fetch_page(session, url, key):
+    entry = page_cache.get(key)
+    res = session.get(url, headers=entry[1] if entry is not None else {})
+    if res.status_code == 304 and entry is None:
+        res = session.get(url)
+    return res, entry
+
+
+# 304 응답이거나 HTML 이 지난번과 같으면 파싱을 건너뛰고 캐시된 결과를 재사용
+def parse_page(key, res, entry, trace, phase):
+    if entry is not None and res.status_code == 304:
+        trace_hit(trace, phase)
+        return open_materials(entry[2])
+
+    digest = hashlib.sha1(res.content).digest()
+    headers = {}
+    if res.headers.get("ETag"):
+        headers["If-None-Match"] = res.headers["ETag"]
+    if res.headers.get("Last-Modified"):
+        headers["If-Modified-Since"] = res.headers["Last-Modified"]
+    if entry is not None and entry[0] == digest:
+        page_cache.set(key, (digest, headers, entry[2]))
+        trace_hit(trace, phase)
+        return open_materials(entry[2])
+
+    with timed(trace, phase):
+        materials = PAGE_PARSERS[key[2]](res.text)
+    page_cache.set(key, (digest, headers, tuple(materials)))
+    return open_materials(materials)
+
+
+# 파싱을 건너뛴 횟수를 <단계 이름>_cached 로 기록
+def trace_hit(trace, phase):
+    with timed(trace, f"{phase}_cached"):
+        pass
+
+
+# 자료 종류별 페이지 경로와 파싱 단계 이름 (aio 의 비동기 요청도 같은 표를 씀)
+MATERIAL_PAGES = {
+    "quizzes": (QUIZ_INDEX_PATH, "parse_quiz_index"),
+    "videos": (VIDEO_PROGRESS_PATH, "parse_user_progress"),
+    "homeworks": (HOMEWORK_INDEX_PATH, "parse_assign_index"),
+}
+
+
+# 강좌 자료 파싱
+def get_materials(session, course_id, kind):
+    path, phase = MATERIAL_PAGES[kind]
+    key = page_key(session, course_id, kind)
+    res, entry = fetch_page(session, plato_url(path.format(course_id)), key)
+    return parse_page(key, res, entry, getattr(session, "trace", None), phase)
+
+# 강좌별로 가져올 자료 종류와 파싱 함수
+MATERIAL_FETCHERS = tuple((kind, functools.partial(get_materials, kind=kind)) for kind in MATERIAL_PAGES)
+
+
+# types 파라미터 값과 Course 속성 이름의 대응
+MATERIAL_TYPES = {
+    "quiz": "quizzes", "quizzes": "quizzes",
+    "video": "videos", "videos": "videos",
+    "homework": "homeworks", "homeworks": "homeworks",
+}
+
+# types/course_ids 를 지정하지 않은 전체 선택
+NO_SELECTION = (None, None)
+
+
+# types, course_ids 쿼리 파라미터 해석 ((가져올 자료 종류, 강좌 id) 튜플, 지정하지 않은 쪽은 None)
+# 알 수 없는 자료 종류가 있으면 ValueError
+def parse_selection(types, course_ids):
+    attrs = None
+    if types:
+        names = [name.strip().lower() for name in types.split(",") if name.strip()]
+        unknown = [name for name in names if name not in MATERIAL_TYPES]
+        if unknown:
+            raise ValueError(f"알 수 없는 자료 종류: {', '.join(unknown)}")
+        requested = {MATERIAL_TYPES[name] for name in names}
+        attrs = tuple(attr for attr, fetch in MATERIAL_FETCHERS if attr in requested)
+    ids = None
+    if course_ids:
+        ids = tuple(sorted({course_id.strip() for course_id in course_ids.split(",") if course_id.strip()}))
+    return attrs, ids
+
+
+# 잘못된 types 파라미터 응답 (400, 사용할 수 있는 자료 종류 목록 포함)
+def invalid_selection_response(error):
+    return JsonResponse({"error": str(error), "valid_types": sorted(MATERIAL_TYPES)}, status=400)
+
+
+# 선택한 강좌만 남김
+def select_courses(courses, selection):
+    attrs, ids = selection
+    if ids is None:
+        return courses
+    return [course for course in courses if course.course_id in ids]
+
+
+# 이미 가져온 강좌에서 선택하지 않은 자료 종류를 비움 (DB 에서 읽은 결과용)
+def select_materials(courses, selection):
+    attrs, ids = selection
+    if attrs is not None:
+        for course in courses:
+            for attr, fetch in MATERIAL_FETCHERS:
+                if attr not in attrs:
+                    setattr(course, attr, [])
     return courses
 
 
-# 날짜/시간 문자열 파싱
-def parse_datetime_string(text):
+# 선택한 범위마다 응답 캐시/single-flight 키를 따로 씀
+def selection_key(key, selection):
+    if selection == NO_SELECTION:
+        return key
+    return f"{key}-{hashlib.sha1(repr(selection).encode()).hexdigest()[:16]}"
+
+
+# 기간 문자열을 초로 변환 ("90m", "24h", "2d", 단위가 없으면 시간, 값이 없으면 default)
+# 형식이 틀리거나 음수/무한대/NaN 이면 ValueError, maximum 보다 길면 maximum 으로 맞춤
+DURATION_UNITS = {"s": 1, "m": 60, "h": 60 * 60, "d": 24 * 60 * 60}
+
+def parse_duration(value, default, maximum):
+    if not value:
+        return default
+    value = value.strip().lower()
+    unit = DURATION_UNITS.get(value[-1:])
+    seconds = float(value[:-1]) * unit if unit else float(value) * DURATION_UNITS["h"]
+    if not math.isfinite(seconds) or seconds < 0:
+        raise ValueError(f"invalid duration: {value}")
+    return min(seconds, maximum)
+
+
+# 요청 파라미터로 받은 동시 요청 수를 설정된 상한 안으로 맞춤
+def resolve_concurrency(value):
+    limit = getattr(settings, "PLATO_MAX_CONCURRENCY", 8)
+    default = getattr(settings, "PLATO_CONCURRENCY", 4)
     try:
-        if text == "-" or not text:
-            return None
-        text = text.replace('T', ' ')
-        return datetime.strptime(text, "%Y-%m-%d %H:%M")
-    except Exception as e:
-        print(f"Error occurred while parsing datetime string: {text}")
-        print(f"Error details: {str(e)}")
+        concurrency = int(value) if value not in (None, "") else default
+    except (TypeError, ValueError):
+        concurrency = default
+    return max(1, min(concurrency, limit))
+
+
+# 강좌 자료 파싱 (max_workers가 1이면 순차, 그 이상이면 강좌별 페이지를 동시에 요청)
+# 강좌의 페이지가 모두 끝날 때마다 그 강좌를 yield (끝난 순서대로, 강좌마다 한 번)
+# 전체 시간(PLATO_SCRAPE_BUDGET)이나 페이지별 시간(PLATO_PAGE_BUDGET)을 넘기거나 실패한 페이지는
+# course.missing 에 표시하고 나머지 결과만 돌려줌
+def iter_courses_materials(session, courses, max_workers=1, types=None):
+    deadline = time.monotonic() + getattr(settings, "PLATO_SCRAPE_BUDGET", 20)
+    page_budget = getattr(settings, "PLATO_PAGE_BUDGET", 10)
+    hedge_after = getattr(settings, "PLATO_HEDGE_AFTER", 3)
+
+    # types 로 고른 자료 종류의 페이지만 요청
+    fetchers = [(attr, fetch) for attr, fetch in MATERIAL_FETCHERS if types is None or attr in types]
+    jobs = [(course, attr, fetch) for course in courses for attr, fetch in fetchers]
+    for course in courses:
+        course.missing = []
+
+    if not jobs:
+        yield from courses
+        return
+
+    remaining = {id(course): len(fetchers) for course in courses}
+    started = {}
+    hedged = set()
+    finished = set()
+    running = {}
+
+    def run(index):
+        started.setdefault(index, time.monotonic())
+        course, attr, fetch = jobs[index]
+        return fetch(session, course.course_id)
+
+    # 결과는 강좌 객체에 바로 넣으므로 courses 의 순서는 그대로 유지됨
+    def finish(index, result=None, failed=False):
+        course, attr, fetch = jobs[index]
+        finished.add(index)
+        if failed:
+            course.missing.append(attr)
+        else:
+            setattr(course, attr, result)
+        remaining[id(course)] -= 1
+        return course if remaining[id(course)] == 0 else None
+
+    # max_workers 가 1 이어도 같은 방식으로 실행해 페이지별 시간 제한과 전체 시간 제한을 똑같이 적용
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(jobs))))
+    try:
+        for index in range(len(jobs)):
+            running[executor.submit(run, index)] = index
+
+        while len(finished) < len(jobs):
+            now = time.monotonic()
+            if now >= deadline:
+                break
+
+            for index in set(running.values()) - finished:
+                begun = started.get(index)
+                if begun is None:
+                    continue
+                if now - begun >= page_budget:
+                    # 페이지별 시간 초과: 더 기다리지 않고 빠진 것으로 표시
+                    course = finish(index, failed=True)
+                    if course is not None:
+                        yield course
+                elif now - begun >= hedge_after and index not in hedged:
+                    # 오래 걸리는 페이지는 한 번 더 요청하고 먼저 끝난 쪽을 사용
+                    hedged.add(index)
+                    running[executor.submit(run, index)] = index
+
+            done, _ = wait(list(running), timeout=min(0.05, deadline - now), return_when=FIRST_COMPLETED)
+            for future in done:
+                index = running.pop(future)
+                if index in finished:
+                    continue
+                try:
+                    result = future.result()
+                except Exception:
+                    # 같은 페이지의 다른 요청이 아직 진행 중이면 그 결과를 기다림
+                    if index in running.values():
+                        continue
+                    course = finish(index, failed=True)
+                else:
+                    course = finish(index, result)
+                if course is not None:
+                    yield course
+
+        # 전체 시간 초과: 끝나지 않은 페이지는 빠진 것으로 표시
+        for index in range(len(jobs)):
+            if index not in finished:
+                course = finish(index, failed=True)
+                if course is not None:
+                    yield course
+    finally:
+        # 중간에 멈춘 경우(스트리밍 연결 끊김, 시간 초과 등) 아직 시작하지 않은 요청은 취소
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def parse_courses_materials(session, courses, max_workers=1, types=None):
+    for _ in iter_courses_materials(session, courses, max_workers, types):
+        pass
+
+# 마감일시를 응답용 문자열로 변환 (같은 강좌의 마감일시는 여러 사용자가 같으므로 결과를 캐시)
+@functools.lru_cache(maxsize=4096)
+def format_due(due):
+    return due.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def format_material(material):
+    if material.due:
+        return {"title": material.title, "due": format_due(material.due)}
+    return {"title": material.title}
+
+
+# 강좌 하나를 응답 데이터로 변환 (퀴즈, 비디오, 과제가 하나도 없으면 None)
+# 시간 초과나 오류로 가져오지 못한 자료 종류는 "missing" 으로 표시
+def build_course_data(course):
+    missing = [attr for attr, fetch in MATERIAL_FETCHERS if attr in course.missing]
+    if not (course.quizzes or course.videos or course.homeworks or missing):
         return None
 
+    # 코스에 대한 정보를 담을 딕셔너리 생성
+    course_data = {"course_name": course.course_name}
+    if course.quizzes:
+        course_data["quizzes"] = [format_material(quiz) for quiz in course.quizzes]
 
+    if course.videos:
+        course_data["videos"] = [{"title": video.title} for video in course.videos]
 
+    if course.homeworks:
+        course_data["homeworks"] = [format_material(homework) for homework in course.homeworks]
 
-# 강좌 자료 파싱
-def get_quizzes(session, course_id):
-    quizzes = []
-    res = session.get(f"https://plato.pusan.ac.kr/mod/quiz/index.php?id={course_id}")
-    soup = BeautifulSoup(res.text, "html.parser")
-
-    for tr in soup.select(".generaltable > tbody > tr"):
-        tds = tr.select("td")
-        title = tds[1].text.strip()
-        due_str = tds[2].text.strip()
-        score = tds[3].text.strip()  # 점수 정보
-        due = parse_datetime_string(due_str)
-
-        if (due == None or datetime.now() < due) and score == "":
-            quizzes.append(CourseMaterial(title, due))
-
-    return quizzes
-
-def get_videos(session, course_id):
-    videos = []
-    res = session.get(f"https://plato.pusan.ac.kr/report/ubcompletion/user_progress_a.php?id={course_id}")
-    soup = BeautifulSoup(res.text, "html.parser")
-
-    for tr in soup.select(".user_progress_table > tbody > tr"):
-        offset = 1
-        if len(tr.contents) == 4:
-            offset = 0
-        tds = tr.select("td")
-        title = tds[offset].text.strip()
-        watched = tds[offset + 3].text.strip()
-
-        if title != "" and watched != "O":
-            videos.append(CourseMaterial(title, None))
-
-    return videos
-
-def get_homeworks(session, course_id):
-    homeworks = []
-    res = session.get(f"https://plato.pusan.ac.kr/mod/assign/index.php?id={course_id}")
-    soup = BeautifulSoup(res.text, "html.parser")
-
-    for tr in soup.select(".generaltable > tbody > tr"):
-        tds = tr.select("td")
-        title = tds[1].text.strip()
-        due_str = tds[2].text.strip()
-        submitted = tds[3].text.strip()
-        due = parse_datetime_string(due_str)
-
-        if (due == None or datetime.now() < due) and submitted == "미제출":
-            homeworks.append(CourseMaterial(title, due))
-
-    return homeworks
-
-def parse_courses_materials(session, courses):
+    if missing:
+        course_data["missing"] = missing
+    return course_data
+
+
+# 강좌 목록을 응답 데이터로 변환
+def build_result_data(courses):
+    result_data = []
     for course in courses:
-        course.quizzes = get_quizzes(session, course.course_id)
-        course.videos = get_videos(session, course.course_id)
-        course.homeworks = get_homeworks(session, course.course_id)
+        course_data = build_course_data(course)
+        # 해당 정보가 있는 경우에만 결과에 추가
+        if course_data is not None:
+            result_data.append(course_data)
+    return result_data
+
+
+# 응답 JSON 본문과 ETag 생성
+def encode_result(result_data):
+    payload = {"data": result_data}
+    if any("missing" in course_data for course_data in result_data):
+        payload["partial"] = True
+    body = dumps_json(payload)
+    etag = f'"{hashlib.sha1(body).hexdigest()}"'
+    return body, etag
+
+
+# 변경 피드 응답 JSON 본문과 ETag 생성 (마감일시는 format_material 과 같은 형식, 없으면 생략)
+def encode_changes(delta):
+    def format_item(item):
+        item = dict(item)
+        due = item.pop("due")
+        if due:
+            item["due"] = format_due(due)
+        return item
+
+    payload = dict(delta)
+    for name in ("items", "added", "updated"):
+        if name in payload:
+            payload[name] = [format_item(item) for item in payload[name]]
+    body = dumps_json(payload)
+    return body, f'"{hashlib.sha1(body).hexdigest()}"'
+
+
+# 클라이언트가 가진 ETag 와 같으면 본문 없이 304 응답
+# Accept 헤더로 MessagePack 을 요청하면 같은 데이터를 MessagePack 으로 응답
+def etag_response(request, body, etag):
+    content_type = "application/json"
+    if accepts_msgpack(request):
+        body, etag = to_msgpack(body, etag)
+        content_type = MSGPACK_CONTENT_TYPES[0]
+    if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+    if if_none_match and (etag in parse_etags(if_none_match) or if_none_match.strip() == "*"):
+        response = HttpResponse(status=304)
+    else:
+        response = HttpResponse(body, content_type=content_type)
+    response["ETag"] = etag
+    response["Vary"] = "Accept"
+    return response
+
+
+# 스트리밍 응답 형식별 Content-Type
+STREAM_CONTENT_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
+
+
+# (이벤트 이름, 데이터) 를 NDJSON 한 줄 또는 server-sent event 로 인코딩
+def encode_stream(events, stream_format):
+    for event, data in events:
+        payload = dumps_json(data)
+        if stream_format == "sse":
+            yield b"event: " + event.encode() + b"\ndata: " + payload + b"\n\n"
+        else:
+            yield b'{"event":"' + event.encode() + b'","data":' + payload + b"}\n"
+
+
+# 강좌 스크랩이 끝나는 대로 이벤트를 내보내고, 모두 끝나면 결과를 저장
+def stream_courses(session, courses, concurrency, username, key, ttl=None, selection=NO_SELECTION):
+    try:
+        for course in iter_courses_materials(session, courses, concurrency, selection[0]):
+            course_data = build_course_data(course)
+            if course_data is not None:
+                yield "course", course_data
+        store_result(username, key, courses, ttl, selection)
+        yield "done", {"count": len(courses), "partial": any(course.missing for course in courses)}
+    except Exception as e:
+        yield "error", {"error": "내부 서버 오류", "details": str(e)}
 
-# Django REST Framework 뷰
-class TestView(APIView):
-    def get(self, request):
+
+# 캐시된 응답 본문을 스트리밍 이벤트로 변환
+def stream_cached(body):
+    for course_data in json.loads(body)["data"]:
+        yield "course", course_data
+    yield "done", {"cached": True}
+
+
+def streaming_response(events, stream_format):
+    response = StreamingHttpResponse(
+        encode_stream(events, stream_format), content_type=STREAM_CONTENT_TYPES[stream_format]
+    )
+    response["Cache-Control"] = "no-cache"
+    return response
+
+
+# 쿼리 파라미터의 참/거짓 값 해석
+def is_truthy(value):
+    return str(value).lower() in ("1", "true", "yes", "on")
+
+
+# 백그라운드 갱신 대상이면 다음 갱신까지 쓸 캐시 TTL
+def prefetch_ttl(enabled):
+    if enabled and refresh_scheduler.enabled:
+        return refresh_scheduler.interval * 1.2
+    return None
+
+
+# 백그라운드 갱신 대상 등록/해제
+def update_prefetch(username, password, enabled):
+    if enabled:
+        refresh_scheduler.register(username, password)
+    else:
+        refresh_scheduler.unregister(username, password)
+
+
+# 로그인부터 강좌 자료까지 스크랩 (로그인 실패 시 None)
+def scrape_courses(username, password, concurrency, trace=None, selection=NO_SELECTION):
+    session = open_session(username, password, trace)
+    if session is None:
+        return None
+
+    with timed(trace, "courses"):
+        courses = select_courses(parse_courses_entry(session), selection)
+    with timed(trace, "materials"):
+        parse_courses_materials(session, courses, max_workers=concurrency, types=selection[0])
+    return courses
+
+
+# 스크랩 결과를 DB 와 응답 캐시에 저장하고 (본문, ETag) 반환
+# 일부 자료가 빠진 결과는 다음 요청에서 다시 스크랩하도록 캐시하지 않음
+# 일부 강좌/자료 종류만 고른 결과는 DB 의 나머지 행을 지우지 않도록 응답 캐시에만 저장
+def store_result(username, key, courses, ttl=None, selection=NO_SELECTION):
+    if selection == NO_SELECTION:
+        save_courses(username, key, courses)
+    cached = encode_result(build_result_data(courses))
+    if not any(course.missing for course in courses):
+        result_cache.set(selection_key(key, selection), cached, ttl)
+    return cached
+
+
+# 스크랩 후 저장까지 실행 (같은 사용자의 동시 요청은 프로세스를 넘어 하나로 합쳐 결과 공유, 로그인 실패 시 None)
+def scrape_and_store(username, password, key, concurrency, trace=None, ttl=None, selection=NO_SELECTION):
+    def run():
+        courses = scrape_courses(username, password, concurrency, trace, selection)
+        if courses is None:
+            return None
+        with timed(trace, "store"):
+            return store_result(username, key, courses, ttl, selection)
+
+    with timed(trace, "scrape"):
+        return singleflight.do(selection_key(key, selection), run)
+
+
+# 여러 사용자를 한 번에 새로 스크랩해서 저장 (모든 요청이 같은 연결 풀과 조절기(governor)를 거침)
+# 사용자별 결과와 전체 처리량 통계를 반환
+def refresh_users(users, concurrency=None, workers=None, include_data=False):
+    limit = getattr(settings, "PLATO_BATCH_WORKERS", 8)
+    workers = max(1, min(workers or limit, limit, len(users) or 1))
+    concurrency = resolve_concurrency(concurrency)
+
+    def run(user):
+        username = user.get("username", "")
+        password = user.get("password", "")
+        trace = Trace()
+        started = time.perf_counter()
         try:
-            username = request.query_params.get('username', '')
-            password = request.query_params.get('password', '')
+            cached = scrape_and_store(username, password, credential_key(username, password), concurrency, trace)
+            if cached is None:
+                result = {"username": username, "status": "login_failed"}
+            else:
+                payload = json.loads(cached[0])
+                result = {
+                    "username": username,
+                    "status": "ok",
+                    "courses": len(payload["data"]),
+                    "partial": payload.get("partial", False),
+                }
+                if include_data:
+                    result["data"] = payload["data"]
+        except Exception as e:
+            result = {"username": username, "status": "error", "error": str(e)}
+        finally:
+            close_old_connections()
+        result["requests"] = trace.count("fetch_")
+        result["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return result
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="plato-batch") as executor:
+        results = list(executor.map(run, users))
+    elapsed = time.perf_counter() - started
+
+    durations = [result["duration_ms"] for result in results]
+    requests_total = sum(result["requests"] for result in results)
+    return {
+        "results": results,
+        "stats": {
+            "users": len(results),
+            "succeeded": sum(result["status"] == "ok" for result in results),
+            "failed": sum(result["status"] != "ok" for result in results),
+            "workers": workers,
+            "elapsed_ms": round(elapsed * 1000, 1),
+            "user_mean_ms": round(sum(durations) / len(durations), 1) if durations else 0,
+            "user_max_ms": max(durations, default=0),
+            "requests": requests_total,
+            "users_per_second": round(len(results) / elapsed, 2) if elapsed else 0,
+            "requests_per_second": round(requests_total / elapsed, 2) if elapsed else 0,
+        },
+    }
 
-            session = requests.Session()
-            if not login(session, username, password):
-                return JsonResponse({"error": "로그인 실패"})
 
-            courses = parse_courses_entry(session)
-            parse_courses_materials(session, courses)
+# /v1/test/ 와 /v1/test/async/ 가 같이 쓰는 쿼리 파라미터 해석 결과 (types 가 잘못되었으면 ValueError)
+class ScrapeParams:
+    def __init__(self, params):
+        self.username = params.get('username', '')
+        self.password = params.get('password', '')
+        self.key = credential_key(self.username, self.password)
+        # types=homework,quiz / course_ids=1,2 로 필요한 자료 종류와 강좌만 요청
+        self.selection = parse_selection(params.get('types'), params.get('course_ids'))
+        self.refresh = is_truthy(params.get('refresh'))
+        # since=<토큰> 이면 토큰 이후 바뀐 자료만 응답하므로 types/course_ids 는 무시
+        self.since = params.get('since')
+        if self.since is not None:
+            self.selection = NO_SELECTION
+        self.source = params.get('source')
+        self.mode = params.get('mode')
+        self.stream_format = params.get('stream') if params.get('stream') in STREAM_CONTENT_TYPES else None
+        self.prefetch = params.get('prefetch')
+        self.concurrency = resolve_concurrency(params.get('concurrency'))
+        self.ttl = prefetch_ttl(is_truthy(self.prefetch))
+
+    @property
+    def cache_key(self):
+        return selection_key(self.key, self.selection)
+
+    # 변경 피드 응답 전에 먼저 스크랩해야 하는지 (캐시가 없으면 스크랩, source=db 이면 저장된 데이터 기준)
+    @property
+    def changes_need_scrape(self):
+        fresh = not self.refresh and result_cache.get(self.key) is not None
+        return not fresh and self.source != 'db'
+
+
+def login_failed_response():
+    return JsonResponse({"error": "로그인 실패"})
+
+
+# 토큰 이후 추가/수정/삭제된 자료와 새 토큰 응답 (DB 조회)
+def changes_response(request, trace, params):
+    with trace.phase("db"):
+        delta = load_changes(params.username, params.key, params.since)
+    if delta is None:
+        return JsonResponse({"error": "저장된 데이터 없음"}, status=404)
+    return etag_response(request, *encode_changes(delta))
+
+
+# 유효한 캐시가 있으면 PLATO 에 요청하지 않고 바로 응답 (없으면 None)
+def cached_response(request, trace, params):
+    cached = None if params.refresh else result_cache.get(params.cache_key)
+    if cached is None:
+        return None
+    trace.add("cache", 0)
+    # 캐시도 같은 아이디/비밀번호로 만든 결과이므로 prefetch 등록/해제는 캐시 응답에도 반영
+    # (스케줄러가 캐시를 계속 채우므로 여기서 빠지면 prefetch=0 으로 해제할 수 없음)
+    if params.prefetch is not None:
+        update_prefetch(params.username, params.password, is_truthy(params.prefetch))
+    if params.stream_format:
+        return streaming_response(stream_cached(cached[0]), params.stream_format)
+    return etag_response(request, *cached)
+
+
+# mode=job 이면 스크랩을 작업 큐에 넣고 작업 id 를 바로 응답 (/v1/jobs/<id>/ 로 결과 조회)
+def submit_job(params):
+    job = job_queue.submit(
+        params.username, params.password, params.key, params.cache_key, params.concurrency, params.selection
+    )
+    return job_response(job)
+
+
+# stream=ndjson|sse 이면 강좌별 스크랩이 끝나는 대로 전송
+def stream_response(trace, params):
+    session = open_session(params.username, params.password, trace)
+    if session is None:
+        return login_failed_response()
+    with trace.phase("courses"):
+        courses = select_courses(parse_courses_entry(session), params.selection)
+    events = stream_courses(
+        session, courses, params.concurrency, params.username, params.key, params.ttl, params.selection
+    )
+    return streaming_response(events, params.stream_format)
+
+
+# source=db 이면 마지막으로 저장된 데이터를 DB 에서 바로 응답 (저장된 적 없으면 None)
+def stored_response(request, trace, params):
+    with trace.phase("db"):
+        courses = load_courses(params.username, params.key)
+    if courses is None:
+        return None
+    courses = select_materials(select_courses(courses, params.selection), params.selection)
+    return etag_response(request, *encode_result(build_result_data(courses)))
 
-            result_data = []
-            for course in courses:
-                # 코스에 대한 정보를 담을 딕셔너리 생성
-                course_data = {"course_name": course.course_name}
 
-                # 퀴즈, 비디오, 과제가 하나라도 있는 경우만 해당 정보 추가
-                if course.quizzes or course.videos or course.homeworks:
-                    if course.quizzes:
-                        course_data["quizzes"] = [{"title": quiz.title, "due": quiz.due.strftime("%Y-%m-%d %H:%M:%S")} if quiz.due else {"title": quiz.title} for quiz in course.quizzes]
+# 스크랩 결과 응답 (로그인 실패 시 cached 는 None)
+def scraped_response(request, params, cached):
+    if cached is None:
+        return login_failed_response()
+    # prefetch=1 이면 백그라운드에서 주기적으로 미리 갱신
+    if params.prefetch is not None:
+        update_prefetch(params.username, params.password, is_truthy(params.prefetch))
+    return etag_response(request, *cached)
 
-                    if course.videos:
-                        course_data["videos"] = [{"title": video.title} for video in course.videos]
 
-                    if course.homeworks:
-                        course_data["homeworks"] = [{"title": homework.title, "due": homework.due.strftime("%Y-%m-%d %H:%M:%S")} if homework.due else {"title": homework.title} for homework in course.homeworks]
+# Django REST Framework 뷰
+# etag_response 로 응답하는 뷰 (JSON 또는 MessagePack)
+# 응답 형식은 etag_response 가 Accept 헤더로 직접 고르므로 DRF 의 렌더러 협상에서 406 이 나지 않게 함
+class ResultAPIView(APIView):
+    def perform_content_negotiation(self, request, force=False):
+        return super().perform_content_negotiation(request, force=True)
 
-                    # 해당 정보가 있는 경우에만 결과에 추가
-                    result_data.append(course_data)
 
-            return JsonResponse({"data": result_data})
+class TestView(ResultAPIView):
+    def get(self, request):
+        # 단계별 소요 시간을 Server-Timing 헤더로 전달
+        trace = Trace()
+        with trace.phase("total"):
+            response = self.respond(request, trace)
+        response["Server-Timing"] = trace.server_timing()
+        return response
+
+    def respond(self, request, trace):
+        try:
+            try:
+                params = ScrapeParams(request.query_params)
+            except ValueError as e:
+                return invalid_selection_response(e)
+
+            if params.since is not None:
+                if params.changes_need_scrape and self.scrape(trace, params) is None:
+                    return login_failed_response()
+                return changes_response(request, trace, params)
+
+            response = cached_response(request, trace, params)
+            if response is not None:
+                return response
+            if params.mode == 'job':
+                return submit_job(params)
+            if params.stream_format:
+                return stream_response(trace, params)
+            if params.source == 'db':
+                response = stored_response(request, trace, params)
+                if response is not None:
+                    return response
+            return scraped_response(request, params, self.scrape(trace, params))
         except Exception as e:
-            return JsonResponse({"error": "내부 서버 오류", "details": str(e)}, status=500)
\ No newline at end of file
+            return JsonResponse({"error": "내부 서버 오류", "details": str(e)}, status=500)
+
+    # 스크랩해서 저장하고 (본문, ETag) 반환 (로그인 실패 시 None)
+    def scrape(self, trace, params):
+        return scrape_and_store(
+            params.username, params.password, params.key, params.concurrency, trace, params.ttl, params.selection
+        )
+
+
+# 마감이 within 이내로 남은 퀴즈/과제 조회 (/v1/due/?within=24h)
+# 스크랩하지 않고 마지막으로 저장된 데이터에서 마감일 인덱스로 범위 조회
+class DueView(APIView):
+    def get(self, request):
+        username = request.query_params.get('username', '')
+        password = request.query_params.get('password', '')
+        try:
+            within = parse_duration(
+                request.query_params.get('within'), 24 * 60 * 60,
+                getattr(settings, "PLATO_DUE_MAX_WITHIN", 366 * 24 * 60 * 60),
+            )
+        except ValueError:
+            return JsonResponse({"error": "잘못된 기간", "details": "within 은 24h, 90m, 2d 같은 형식이어야 함"}, status=400)
+        start = timezone.now()
+        items = load_due(username, credential_key(username, password), start, start + timedelta(seconds=within))
+        if items is None:
+            return JsonResponse({"error": "저장된 데이터 없음"}, status=404)
+
+        data = [
+            {
+                "course_id": item["course_id"],
+                "course_name": item["course_name"],
+                "kind": item["kind"],
+                **format_material(CourseMaterial(item["title"], item["due"])),
+            }
+            for item in items
+        ]
+        return JsonResponse({"data": data})
+
+
+# 끝나지 않은 작업의 상태 응답 (202, Location 에 결과 조회 주소)
+def job_response(job):
+    response = JsonResponse({"job_id": str(job.pk), "status": job.status}, status=202)
+    response["Location"] = f"/v1/jobs/{job.pk}/"
+    return response
+
+
+# 작업 큐 모드 결과 조회 (/v1/jobs/<id>/?wait=10 이면 끝날 때까지 최대 10초 기다림)
+class JobView(ResultAPIView):
+    def get(self, request, job_id):
+        username = request.query_params.get('username', '')
+        password = request.query_params.get('password', '')
+        try:
+            wait = float(request.query_params.get('wait', 0))
+        except ValueError:
+            wait = 0
+        job = job_queue.wait(job_id, max(0, min(wait, getattr(settings, "PLATO_JOB_MAX_WAIT", 30))))
+        if job is None or not constant_time_compare(job.credential_key, credential_key(username, password)):
+            return JsonResponse({"error": "작업 없음"}, status=404)
+        if job.status == job.DONE:
+            return etag_response(request, bytes(job.body), job.etag)
+        if job.status == job.FAILED:
+            return JsonResponse({"job_id": str(job.pk), "status": job.status, "error": job.error})
+        return job_response(job)
+
+
+# 여러 사용자 일괄 갱신 (POST /v1/batch/ {"users": [{"username", "password"}, ...]})
+# 선택: concurrency (사용자별 동시 요청 수), workers (동시에 갱신할 사용자 수), include_data
+# 요청 안에서 바로 갱신하므로 PLATO_BATCH_MAX_USERS 명까지만 받음 (더 많은 사용자는 plato_refresh 명령 사용)
+class BatchRefreshView(APIView):
+    def post(self, request):
+        if not isinstance(request.data, dict):
+            return JsonResponse({"error": "요청 본문은 JSON 객체여야 합니다"}, status=400)
+        users = request.data.get("users")
+        if not isinstance(users, list) or not all(isinstance(user, dict) for user in users):
+            return JsonResponse({"error": "users 는 아이디/비밀번호 객체 목록이어야 합니다"}, status=400)
+        limit = getattr(settings, "PLATO_BATCH_MAX_USERS", 20)
+        if len(users) > limit:
+            return JsonResponse({"error": f"한 번에 최대 {limit}명까지 갱신할 수 있습니다"}, status=400)
+
+        try:
+            workers = int(request.data.get("workers") or 0)
+        except (TypeError, ValueError):
+            workers = 0
+        result = refresh_users(
+            users,
+            concurrency=request.data.get("concurrency"),
+            workers=workers,
+            include_data=is_truthy(request.data.get("include_data")),
+        )
+        return JsonResponse(result)
+
+
+# 스크래퍼 지표 조회 (단계별/페이지 종류별 지연 시간 히스토그램)
+# POST 는 지표를 초기화하고 초기화 직전 지표를 반환 (관리자만 가능)
+class MetricsView(APIView):
+    def get(self, request):
+        return JsonResponse({**metrics.snapshot(), "governor": governor.snapshot()})
+
+    def post(self, request):
+        if not request.user.is_staff:
+            return JsonResponse({"error": "권한 없음"}, status=403)
+        snapshot = {**metrics.snapshot(), "governor": governor.snapshot()}
+        metrics.reset()
+        return JsonResponse(snapshot)
@@ -0,0 +1,45 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+from .cache import TTLCache
+
+MSGPACK_CONTENT_TYPES = ("application/msgpack", "application/x-msgpack")
+
+# orjson 이 없을 때 쓰는 기본 인코더 (공백 없이, 한글은 \u 이스케이프 없이 UTF-8 로)
+_json_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+# JSON 본문 ETag 별 MessagePack 변환 결과 캐시
+_msgpack_cache = TTLCache(1000, 5 * 60)
+
+
+# 응답 데이터를 JSON bytes 로 인코딩 (orjson 이 설치되어 있으면 사용)
+def dumps_json(payload):
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return _json_encoder.encode(payload).encode()
+
+
+# Accept 헤더로 MessagePack 응답을 요청했는지 확인 (msgpack 이 없으면 항상 JSON)
+def accepts_msgpack(request):
+    if msgpack is None:
+        return False
+    accept = request.META.get("HTTP_ACCEPT", "")
+    return any(content_type in accept for content_type in MSGPACK_CONTENT_TYPES)
+
+
+# JSON 본문을 MessagePack 으로 변환해 (본문, ETag) 반환 (같은 ETag 는 한 번만 변환)
+def to_msgpack(body, etag):
+    packed = _msgpack_cache.get(etag)
+    if packed is None:
+        packed = msgpack.packb(json.loads(body), use_bin_type=True)
+        _msgpack_cache.set(etag, packed)
+    return packed, f'{etag[:-1]}-msgpack"'
@@ -0,0 +1,127 @@
+import asyncio
+import random
+import threading
+import time
+
+from django.conf import settings
+
+
+# plato.pusan.ac.kr 로 나가는 모든 요청을 조절하는 프로세스 전체 조절기
+# - 토큰 버킷으로 초당 요청 수 제한
+# - 동시 요청 수 상한을 응답 상태에 맞춰 조절 (느리거나 5xx 면 줄이고, 정상이면 조금씩 늘림)
+# - 실패한 요청은 지터를 준 지수 백오프로 재시도
+class RequestGovernor:
+    def __init__(self, rate, burst, min_limit, max_limit, slow_response, retries, backoff):
+        self.rate = rate
+        self.burst = burst
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.slow_response = slow_response
+        self.retries = retries
+        self.backoff = backoff
+
+        self.limit = float(max(min_limit, min(max_limit, min_limit * 4)))
+        self.in_flight = 0
+        self.tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    # 바로 보낼 수 있으면 자리를 잡고 0, 아니면 기다릴 시간(초) 반환
+    def try_acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            if self.in_flight >= int(self.limit):
+                return 0.01
+            if self.tokens < 1:
+                return (1 - self.tokens) / self.rate
+            self.tokens -= 1
+            self.in_flight += 1
+            return 0
+
+    def acquire(self):
+        while True:
+            wait = self.try_acquire()
+            if not wait:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        while True:
+            wait = self.try_acquire()
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+    def release(self, duration, failed):
+        with self._lock:
+            self.in_flight -= 1
+            if failed or duration > self.slow_response:
+                self.limit = max(self.min_limit, self.limit * 0.7)
+            else:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    # 재시도할 응답인지 확인 (5xx, 429)
+    def is_retryable(self, res):
+        return res.status_code >= 500 or res.status_code == 429
+
+    # 다음 재시도까지 기다릴 시간 (Retry-After 가 있으면 우선)
+    def retry_delay(self, attempt, res=None):
+        retry_after = res.headers.get("Retry-After") if res is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(int(retry_after), 30)
+        return random.uniform(0, self.backoff * (2 ** attempt))
+
+    def call(self, send, retry_exceptions=()):
+        for attempt in range(self.retries + 1):
+            self.acquire()
+            started = time.monotonic()
+            res = None
+            try:
+                res = send()
+            except retry_exceptions:
+                if attempt == self.retries:
+                    raise
+            finally:
+                failed = res is None or self.is_retryable(res)
+                self.release(time.monotonic() - started, failed)
+            if not failed or attempt == self.retries:
+                return res
+            time.sleep(self.retry_delay(attempt, res))
+
+    async def call_async(self, send, retry_exceptions=()):
+        for attempt in range(self.retries + 1):
+            await self.acquire_async()
+            started = time.monotonic()
+            res = None
+            try:
+                res = await send()
+            except retry_exceptions:
+                if attempt == self.retries:
+                    raise
+            finally:
+                failed = res is None or self.is_retryable(res)
+                self.release(time.monotonic() - started, failed)
+            if not failed or attempt == self.retries:
+                return res
+            await asyncio.sleep(self.retry_delay(attempt, res))
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "limit": round(self.limit, 2),
+                "in_flight": self.in_flight,
+                "tokens": round(self.tokens, 2),
+            }
+
+
+governor = RequestGovernor(
+    rate=getattr(settings, "PLATO_RATE_LIMIT", 20),
+    burst=getattr(settings, "PLATO_RATE_BURST", 40),
+    min_limit=getattr(settings, "PLATO_CONCURRENCY_LIMIT_MIN", 4),
+    max_limit=getattr(settings, "PLATO_CONCURRENCY_LIMIT_MAX", 64),
+    slow_response=getattr(settings, "PLATO_SLOW_RESPONSE", 3.0),
+    retries=getattr(settings, "PLATO_RETRIES", 2),
+    backoff=getattr(settings, "PLATO_RETRY_BACKOFF", 0.5),
+)
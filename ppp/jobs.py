@@ -0,0 +1,112 @@
+import django
+import functools
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .models import ScrapeJob
+
+logger = logging.getLogger(__name__)
+
+
+# 작업 프로세스에서 스크랩을 실행하고 상태와 결과를 ScrapeJob 에 기록
+# 비밀번호는 DB 에 남기지 않고 작업 큐로만 전달
+def run_job(job_id, username, password, key, concurrency, selection):
+    from .api import scrape_and_store
+
+    jobs = ScrapeJob.objects.filter(pk=job_id)
+    try:
+        jobs.update(status=ScrapeJob.RUNNING)
+        result = scrape_and_store(username, password, key, concurrency, selection=selection)
+        if result is None:
+            jobs.update(status=ScrapeJob.FAILED, error="로그인 실패", finished_at=timezone.now())
+        else:
+            body, etag = result
+            jobs.update(status=ScrapeJob.DONE, body=body, etag=etag, finished_at=timezone.now())
+    except Exception as e:
+        logger.exception("Scrape job %s failed", job_id)
+        jobs.update(status=ScrapeJob.FAILED, error=str(e), finished_at=timezone.now())
+    finally:
+        close_old_connections()
+
+
+# 웹 워커와 분리된 스크래퍼 작업 큐 (외부 브로커 없이 SQLite + 로컬 프로세스 풀)
+# 작업 상태는 DB 에 있으므로 어느 웹 프로세스에서든 조회할 수 있음
+class JobQueue:
+    def __init__(self):
+        self.retention = getattr(settings, "PLATO_JOB_RETENTION", 60 * 60)
+        self.poll_interval = getattr(settings, "PLATO_JOB_POLL_INTERVAL", 0.2)
+        # 이 시간이 지나도 끝나지 않은 작업은 작업을 넣은 프로세스가 종료된 것으로 보고 다시 실행
+        self.stale_after = getattr(settings, "PLATO_SCRAPE_BUDGET", 20) * 3
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                workers = getattr(settings, "PLATO_JOB_WORKERS", 2)
+                if getattr(settings, "PLATO_JOB_PROCESSES", True):
+                    # 작업 프로세스는 spawn 으로 시작하므로 먼저 Django 설정을 불러옴
+                    # (이 모듈은 모델을 불러오므로 초기화 함수로 쓸 수 없음)
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=django.setup,
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="plato-job")
+            return self._executor
+
+    # 같은 범위의 작업이 이미 대기/실행 중이면 새로 만들지 않고 그 작업을 돌려줌
+    def submit(self, username, password, key, cache_key, concurrency, selection):
+        self._cleanup()
+        job = ScrapeJob.objects.filter(
+            cache_key=cache_key,
+            status__in=[ScrapeJob.PENDING, ScrapeJob.RUNNING],
+            created_at__gte=timezone.now() - timedelta(seconds=self.stale_after),
+        ).first()
+        if job is not None:
+            return job
+
+        job = ScrapeJob.objects.create(username=username, credential_key=key, cache_key=cache_key)
+        executor = self._get_executor()
+        future = executor.submit(run_job, job.pk, username, password, key, concurrency, selection)
+        future.add_done_callback(functools.partial(self._check_failed, executor, job.pk))
+        return job
+
+    # 작업 프로세스가 비정상 종료되면 작업을 실패로 기록하고 다음 요청 때 풀을 새로 만듦
+    def _check_failed(self, executor, job_id, future):
+        error = future.exception()
+        if error is None:
+            return
+        logger.error("Scrape job %s crashed: %r", job_id, error)
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        ScrapeJob.objects.filter(pk=job_id, status__in=[ScrapeJob.PENDING, ScrapeJob.RUNNING]).update(
+            status=ScrapeJob.FAILED, error=str(error) or type(error).__name__, finished_at=timezone.now()
+        )
+        close_old_connections()
+
+    # 작업이 끝나거나 timeout 초가 지날 때까지 기다린 뒤 작업 반환 (없으면 None)
+    def wait(self, job_id, timeout=0):
+        deadline = time.monotonic() + timeout
+        while True:
+            job = ScrapeJob.objects.filter(pk=job_id).first()
+            if job is None or job.finished_at is not None or time.monotonic() >= deadline:
+                return job
+            time.sleep(min(self.poll_interval, max(0, deadline - time.monotonic())))
+
+    # 보관 기간이 지난 작업 삭제
+    def _cleanup(self):
+        ScrapeJob.objects.filter(created_at__lt=timezone.now() - timedelta(seconds=self.retention)).delete()
+
+
+job_queue = JobQueue()
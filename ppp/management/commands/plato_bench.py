@@ -0,0 +1,188 @@
+import json
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from asgiref.sync import async_to_sync
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from django.test import RequestFactory, override_settings
+
+from ppp.encoding import msgpack, orjson
+from ppp.parsers import (
+    Course, CourseMaterial, available_parsers, parse_course_list, parse_quizzes, parse_videos, parse_homeworks,
+)
+from ppp.stub_server import PlatoStubServer, build_main_page, load_fixture
+
+
+# 페이지 종류별 파싱 함수와 저장된 페이지
+PARSE_CASES = (
+    ("main", parse_course_list, None),
+    ("quiz_index", parse_quizzes, "quiz_index.html"),
+    ("assign_index", parse_homeworks, "assign_index.html"),
+    ("user_progress", parse_videos, "user_progress.html"),
+)
+
+
+# 응답 인코딩 벤치마크용 강좌 목록 (마감일시는 강좌마다 같은 몇 개를 돌려 씀)
+def build_sample_courses(course_count, material_count):
+    base = datetime(2099, 10, 20, 23, 59)
+    dues = [base + timedelta(days=day) for day in range(7)]
+    courses = []
+    for index in range(course_count):
+        course = Course(str(100000 + index), f"강좌 {index} (CB{index:07d}-061)")
+        course.quizzes = [CourseMaterial(f"퀴즈 {n}", dues[n % len(dues)]) for n in range(material_count)]
+        course.videos = [CourseMaterial(f"{n}-1 강의 동영상", None) for n in range(material_count)]
+        course.homeworks = [CourseMaterial(f"과제 {n}", dues[n % len(dues)]) for n in range(material_count)]
+        courses.append(course)
+    return courses
+
+
+# 이전 방식 (자료마다 strftime, DjangoJSONEncoder 로 직렬화) 비교용
+def legacy_encode(courses):
+    def format_material(material):
+        if material.due:
+            return {"title": material.title, "due": material.due.strftime("%Y-%m-%d %H:%M:%S")}
+        return {"title": material.title}
+
+    result_data = []
+    for course in courses:
+        course_data = {"course_name": course.course_name}
+        if course.quizzes:
+            course_data["quizzes"] = [format_material(quiz) for quiz in course.quizzes]
+        if course.videos:
+            course_data["videos"] = [{"title": video.title} for video in course.videos]
+        if course.homeworks:
+            course_data["homeworks"] = [format_material(homework) for homework in course.homeworks]
+        result_data.append(course_data)
+    return json.dumps({"data": result_data}, cls=DjangoJSONEncoder).encode()
+
+
+def percentile(values, ratio):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * ratio))]
+
+
+class Command(BaseCommand):
+    help = "저장된 PLATO 페이지와 로컬 스텁 서버로 스크래퍼 성능을 측정합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--courses", type=int, default=8, help="스텁 서버의 강좌 수")
+        parser.add_argument("--latency", type=float, default=50, help="스텁 서버 응답 지연 (ms)")
+        parser.add_argument("--iterations", type=int, default=5, help="엔드투엔드 측정 반복 횟수")
+        parser.add_argument("--parse-iterations", type=int, default=200, help="페이지별 파싱 반복 횟수")
+        parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8], help="비교할 동시 요청 수")
+        parser.add_argument(
+            "--rate", type=float, default=0, help="벤치마크 중 PLATO 초당 요청 제한 (0 이면 제한 없음)"
+        )
+        parser.add_argument("--encode-courses", type=int, default=20, help="인코딩 벤치마크의 강좌 수")
+        parser.add_argument(
+            "--encode-materials", type=int, default=30, help="인코딩 벤치마크의 강좌별 자료 종류당 개수"
+        )
+        parser.add_argument("--encode-iterations", type=int, default=200, help="응답 인코딩 반복 횟수")
+        parser.add_argument("--skip-parse", action="store_true", help="파싱 벤치마크 생략")
+        parser.add_argument("--skip-encode", action="store_true", help="응답 인코딩 벤치마크 생략")
+        parser.add_argument("--skip-e2e", action="store_true", help="엔드투엔드 벤치마크 생략")
+
+    def handle(self, *args, **options):
+        if not options["skip_parse"]:
+            self.bench_parse(options["courses"], options["parse_iterations"])
+        if not options["skip_encode"]:
+            self.bench_encode(options["encode_courses"], options["encode_materials"], options["encode_iterations"])
+        if not options["skip_e2e"]:
+            self.bench_e2e(options)
+
+    # 페이지 종류/파서별 파싱 처리량
+    def bench_parse(self, course_count, iterations):
+        self.stdout.write("[parse] page type / parser: pages/s (ms/page)")
+        for name, parse, fixture in PARSE_CASES:
+            html = build_main_page(course_count) if fixture is None else load_fixture(fixture)
+            for parser in available_parsers():
+                started = time.perf_counter()
+                for _ in range(iterations):
+                    parse(html, parser)
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"  {name:<14} {parser:<12} {iterations / elapsed:9.1f} ({elapsed / iterations * 1000:.3f})"
+                )
+
+    # 강좌 목록을 응답 본문으로 만드는 처리량 (이전 방식 / 현재 JSON / MessagePack)
+    def bench_encode(self, course_count, material_count, iterations):
+        from ppp.api import build_result_data, encode_result
+
+        courses = build_sample_courses(course_count, material_count)
+        cases = [
+            ("legacy json", lambda: legacy_encode(courses)),
+            (f"json ({'orjson' if orjson else 'stdlib'})", lambda: encode_result(build_result_data(courses))[0]),
+        ]
+        if msgpack is not None:
+            cases.append(("msgpack", lambda: msgpack.packb({"data": build_result_data(courses)}, use_bin_type=True)))
+
+        self.stdout.write(
+            f"[encode] {course_count} courses x {material_count * 3} materials: encodes/s (ms/encode, bytes)"
+        )
+        for name, encode in cases:
+            size = len(encode())
+            started = time.perf_counter()
+            for _ in range(iterations):
+                encode()
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"  {name:<16} {iterations / elapsed:9.1f} ({elapsed / iterations * 1000:.3f}, {size})"
+            )
+
+    # 스텁 서버를 상대로 TestView 전체 응답 시간 측정 (DB 는 임시 테스트 DB 사용)
+    def bench_e2e(self, options):
+        from ppp.api import TestView, page_cache, result_cache, session_cache
+        from ppp.governor import governor
+
+        views = [("TestView", TestView.as_view())]
+        try:
+            from ppp.aio import AsyncTestView
+            views.append(("AsyncTestView", async_to_sync(AsyncTestView.as_view())))
+        except ImportError:
+            pass
+
+        # 스텁 서버 상대로는 전역 요청 조절기의 속도 제한을 벤치마크 설정으로 바꿈
+        saved_rate = (governor.rate, governor.burst)
+        governor.rate = options["rate"] or 1e9
+        governor.burst = max(1.0, governor.rate)
+        governor.tokens = governor.burst
+
+        factory = RequestFactory()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with PlatoStubServer(options["courses"], options["latency"] / 1000) as server:
+                self.stdout.write(
+                    f"[e2e] {options['courses']} courses, {options['latency']:.0f} ms latency: "
+                    "median / p90 ms (PLATO requests per call)"
+                )
+                with override_settings(PLATO_URL=server.url):
+                    for name, view in views:
+                        for concurrency in options["concurrency"]:
+                            timings = []
+                            requests_before = server.request_count
+                            for _ in range(options["iterations"]):
+                                # 매번 처음 요청하는 것과 같도록 페이지 캐시까지 비움
+                                result_cache.clear()
+                                session_cache.clear()
+                                page_cache.clear()
+                                request = factory.get("/v1/test/", {
+                                    "username": "bench", "password": "bench",
+                                    "concurrency": concurrency, "refresh": 1,
+                                })
+                                started = time.perf_counter()
+                                response = view(request)
+                                timings.append((time.perf_counter() - started) * 1000)
+                                if response.status_code != 200:
+                                    raise RuntimeError(response.content.decode())
+                            per_call = (server.request_count - requests_before) / options["iterations"]
+                            self.stdout.write(
+                                f"  {name:<14} concurrency={concurrency:<3} "
+                                f"{statistics.median(timings):8.1f} / {percentile(timings, 0.9):8.1f} "
+                                f"({per_call:.0f})"
+                            )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            governor.rate, governor.burst = saved_rate
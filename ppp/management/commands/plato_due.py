@@ -0,0 +1,28 @@
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from ppp.api import parse_duration
+from ppp.store import load_due_all
+
+
+class Command(BaseCommand):
+    help = "모든 사용자의 마감 임박 퀴즈/과제를 마감 순으로 한 줄에 하나씩 JSON 으로 출력합니다 (알림 발송용)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--within", default="24h", help="지금부터 조회할 기간 (예: 90m, 24h, 2d)")
+
+    def handle(self, *args, **options):
+        start = timezone.now()
+        try:
+            within = parse_duration(
+                options["within"], 24 * 60 * 60, getattr(settings, "PLATO_DUE_MAX_WITHIN", 366 * 24 * 60 * 60)
+            )
+        except ValueError:
+            raise CommandError(f"잘못된 기간입니다: {options['within']} (예: 90m, 24h, 2d)")
+        for item in load_due_all(start, start + timedelta(seconds=within)):
+            self.stdout.write(json.dumps(item, cls=DjangoJSONEncoder, ensure_ascii=False))
@@ -0,0 +1,39 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ppp.api import refresh_users
+
+
+class Command(BaseCommand):
+    help = "여러 사용자의 PLATO 데이터를 한 번에 새로 스크랩해서 저장하고, 사용자별 결과와 처리량을 JSON 으로 출력합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "file", nargs="?", default="-",
+            help='[{"username": ..., "password": ...}, ...] 형식의 JSON 파일 (생략하거나 - 이면 표준 입력)',
+        )
+        parser.add_argument("--workers", type=int, default=None, help="동시에 갱신할 사용자 수")
+        parser.add_argument("--concurrency", type=int, default=None, help="사용자별 동시 요청 수")
+        parser.add_argument("--include-data", action="store_true", help="사용자별 강좌 자료도 출력")
+
+    def handle(self, *args, **options):
+        try:
+            if options["file"] == "-":
+                users = json.load(sys.stdin)
+            else:
+                with open(options["file"], encoding="utf-8") as file:
+                    users = json.load(file)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"사용자 목록을 읽을 수 없습니다: {e}")
+        if not isinstance(users, list) or not all(isinstance(user, dict) for user in users):
+            raise CommandError("사용자 목록은 아이디/비밀번호 객체의 JSON 배열이어야 합니다.")
+
+        result = refresh_users(
+            users,
+            concurrency=options["concurrency"],
+            workers=options["workers"],
+            include_data=options["include_data"],
+        )
+        self.stdout.write(json.dumps(result, ensure_ascii=False, indent=2))
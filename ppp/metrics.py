@@ -0,0 +1,139 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+# 지연 시간 히스토그램 구간 (ms, 마지막은 그 이상 전부)
+LATENCY_BUCKETS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# URL 경로로 PLATO 페이지 종류 구분
+PAGE_TYPES = (
+    ("login/index.php", "login"),
+    ("mod/quiz/index.php", "quiz_index"),
+    ("mod/quiz/view.php", "quiz_view"),
+    ("mod/assign/index.php", "assign_index"),
+    ("report/ubcompletion/user_progress_a.php", "user_progress"),
+)
+
+
+def page_type(url):
+    path = urlsplit(str(url)).path
+    for suffix, name in PAGE_TYPES:
+        if path.endswith(suffix):
+            return name
+    return "main" if path in ("", "/") else "other"
+
+
+# 구간별 개수를 세는 지연 시간 히스토그램
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def as_dict(self):
+        buckets = {f"le_{bound}": count for bound, count in zip(LATENCY_BUCKETS, self.counts)}
+        buckets["inf"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total / self.count, 3) if self.count else 0,
+            "max_ms": round(self.max, 3),
+            "buckets": buckets,
+        }
+
+
+# 프로세스 전체의 단계별/페이지 종류별 지연 시간, 응답 크기, 상태 코드 집계
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._phases = {}
+        self._requests = {}
+
+    def observe_phase(self, name, duration_ms):
+        with self._lock:
+            self._phases.setdefault(name, Histogram()).observe(duration_ms)
+
+    def observe_request(self, url, duration_ms, size, status):
+        with self._lock:
+            stats = self._requests.setdefault(page_type(url), {"latency": Histogram(), "bytes": 0, "status": {}})
+            stats["latency"].observe(duration_ms)
+            stats["bytes"] += size
+            stats["status"][str(status)] = stats["status"].get(str(status), 0) + 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "phases": {name: histogram.as_dict() for name, histogram in self._phases.items()},
+                "requests": {
+                    name: {**stats["latency"].as_dict(), "bytes": stats["bytes"], "status": dict(stats["status"])}
+                    for name, stats in self._requests.items()
+                },
+            }
+
+    def reset(self):
+        with self._lock:
+            self._phases.clear()
+            self._requests.clear()
+
+
+metrics = MetricsRegistry()
+
+
+# 한 번의 API 요청 동안 단계별 소요 시간을 모아 Server-Timing 헤더로 만듦
+class Trace:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def add(self, name, duration_ms):
+        with self._lock:
+            total, count = self._entries.get(name, (0.0, 0))
+            self._entries[name] = (total + duration_ms, count + 1)
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            self.add(name, duration_ms)
+            metrics.observe_phase(name, duration_ms)
+
+    # 이름이 prefix 로 시작하는 항목의 기록 횟수 (예: "fetch_" 이면 PLATO 요청 수)
+    def count(self, prefix=""):
+        with self._lock:
+            return sum(count for name, (total, count) in self._entries.items() if name.startswith(prefix))
+
+    def server_timing(self):
+        with self._lock:
+            entries = list(self._entries.items())
+        values = []
+        for name, (total, count) in entries:
+            value = f"{name};dur={total:.1f}"
+            if count > 1:
+                value += f';desc="{count}x"'
+            values.append(value)
+        return ", ".join(values)
+
+
+# trace 가 없을 때도 전역 지표는 남기는 단계 측정
+@contextmanager
+def timed(trace, name):
+    if trace is not None:
+        with trace.phase(name):
+            yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.observe_phase(name, (time.perf_counter() - started) * 1000)
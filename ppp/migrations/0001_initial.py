@@ -0,0 +1,57 @@
+# Generated by Django 4.2.30 on 2026-10-18 08:03
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlatoUser',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('username', models.CharField(max_length=150, unique=True)),
+                ('credential_key', models.CharField(max_length=64)),
+                ('refreshed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PlatoCourse',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('course_id', models.CharField(max_length=32)),
+                ('course_name', models.CharField(max_length=255)),
+                ('position', models.PositiveIntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='courses', to='ppp.platouser')),
+            ],
+            options={
+                'ordering': ['user', 'position'],
+            },
+        ),
+        migrations.CreateModel(
+            name='PlatoMaterial',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('quiz', '퀴즈'), ('video', '동영상'), ('homework', '과제')], max_length=16)),
+                ('title', models.CharField(max_length=500)),
+                ('due', models.DateTimeField(blank=True, null=True)),
+                ('position', models.PositiveIntegerField(default=0)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='materials', to='ppp.platocourse')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='materials', to='ppp.platouser')),
+            ],
+            options={
+                'ordering': ['course', 'kind', 'position'],
+                'indexes': [models.Index(fields=['user', 'due'], name='material_user_due_idx'), models.Index(fields=['kind', 'due'], name='material_kind_due_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='platocourse',
+            constraint=models.UniqueConstraint(fields=('user', 'course_id'), name='unique_user_course'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 08:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ppp', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='platomaterial',
+            index=models.Index(fields=['due'], name='material_due_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.30 on 2026-10-18 08:26
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ppp', '0003_scrapejob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='platomaterial',
+            name='revision',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='platouser',
+            name='revision',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='PlatoChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('revision', models.PositiveIntegerField()),
+                ('op', models.CharField(choices=[('added', '추가'), ('updated', '수정'), ('removed', '삭제')], max_length=16)),
+                ('item_id', models.CharField(max_length=16)),
+                ('course_id', models.CharField(max_length=32)),
+                ('course_name', models.CharField(max_length=255)),
+                ('kind', models.CharField(choices=[('quiz', '퀴즈'), ('video', '동영상'), ('homework', '과제')], max_length=16)),
+                ('title', models.CharField(max_length=500)),
+                ('due', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='changes', to='ppp.platouser')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'revision'], name='change_user_revision_idx')],
+            },
+        ),
+    ]
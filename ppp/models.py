@@ -1,3 +1,122 @@
+import uuid
+
 from django.db import models
 
-# Create your models here.
+
+# PLATO 사용자
+class PlatoUser(models.Model):
+    username = models.CharField(max_length=150, unique=True)
+    credential_key = models.CharField(max_length=64)
+    refreshed_at = models.DateTimeField(null=True, blank=True)
+    # 자료가 바뀔 때마다 1씩 증가 (변경 피드의 토큰)
+    revision = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return self.username
+
+
+# 사용자가 수강 중인 강좌
+class PlatoCourse(models.Model):
+    user = models.ForeignKey(PlatoUser, on_delete=models.CASCADE, related_name="courses")
+    course_id = models.CharField(max_length=32)
+    course_name = models.CharField(max_length=255)
+    position = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["user", "position"]
+        constraints = [
+            models.UniqueConstraint(fields=["user", "course_id"], name="unique_user_course"),
+        ]
+
+    def __str__(self):
+        return self.course_name
+
+
+# 강좌의 미완료 퀴즈/동영상/과제
+class PlatoMaterial(models.Model):
+    QUIZ = "quiz"
+    VIDEO = "video"
+    HOMEWORK = "homework"
+    KIND_CHOICES = [
+        (QUIZ, "퀴즈"),
+        (VIDEO, "동영상"),
+        (HOMEWORK, "과제"),
+    ]
+
+    user = models.ForeignKey(PlatoUser, on_delete=models.CASCADE, related_name="materials")
+    course = models.ForeignKey(PlatoCourse, on_delete=models.CASCADE, related_name="materials")
+    kind = models.CharField(max_length=16, choices=KIND_CHOICES)
+    title = models.CharField(max_length=500)
+    due = models.DateTimeField(null=True, blank=True)
+    position = models.PositiveIntegerField(default=0)
+    # 마지막으로 추가/수정된 리비전
+    revision = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["course", "kind", "position"]
+        indexes = [
+            models.Index(fields=["user", "due"], name="material_user_due_idx"),
+            models.Index(fields=["kind", "due"], name="material_kind_due_idx"),
+            models.Index(fields=["due"], name="material_due_idx"),
+        ]
+
+    def __str__(self):
+        return self.title
+
+
+# 리비전별 자료 변경 기록 (?since=<토큰> 변경 피드용)
+class PlatoChange(models.Model):
+    ADDED = "added"
+    UPDATED = "updated"
+    REMOVED = "removed"
+    OP_CHOICES = [
+        (ADDED, "추가"),
+        (UPDATED, "수정"),
+        (REMOVED, "삭제"),
+    ]
+
+    user = models.ForeignKey(PlatoUser, on_delete=models.CASCADE, related_name="changes")
+    revision = models.PositiveIntegerField()
+    op = models.CharField(max_length=16, choices=OP_CHOICES)
+    item_id = models.CharField(max_length=16)
+    course_id = models.CharField(max_length=32)
+    course_name = models.CharField(max_length=255)
+    kind = models.CharField(max_length=16, choices=PlatoMaterial.KIND_CHOICES)
+    title = models.CharField(max_length=500)
+    due = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "revision"], name="change_user_revision_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.title} ({self.op})"
+
+
+# 작업 큐 모드로 요청된 스크랩 작업 (작업 프로세스가 상태와 결과를 기록)
+class ScrapeJob(models.Model):
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "대기"),
+        (RUNNING, "실행 중"),
+        (DONE, "완료"),
+        (FAILED, "실패"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    username = models.CharField(max_length=150)
+    credential_key = models.CharField(max_length=64)
+    cache_key = models.CharField(max_length=100, db_index=True)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=PENDING)
+    body = models.BinaryField(null=True, blank=True)
+    etag = models.CharField(max_length=100, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.username} ({self.status})"
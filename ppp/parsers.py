@@ -0,0 +1,148 @@
+import re
+from bs4 import BeautifulSoup, SoupStrainer
+from datetime import datetime
+from django.conf import settings
+
+try:
+    import lxml  # noqa: F401
+    DEFAULT_HTML_PARSER = "lxml"
+except ImportError:
+    DEFAULT_HTML_PARSER = "html.parser"
+
+
+# 강좌 클래스
+class Course:
+    __slots__ = ("course_id", "course_name", "quizzes", "videos", "homeworks", "missing")
+
+    def __init__(self, course_id, course_name):
+        self.course_id = course_id
+        self.course_name = course_name
+        self.quizzes = []
+        self.videos = []
+        self.homeworks = []
+        # 시간 초과나 오류로 가져오지 못한 자료 종류 (quizzes, videos, homeworks)
+        self.missing = []
+
+
+# 강좌 자료 클래스
+class CourseMaterial:
+    __slots__ = ("title", "due")
+
+    def __init__(self, title, due):
+        self.title = title
+        self.due = due
+
+
+# class 속성에 name 이 포함된 태그를 찾는 패턴 (class 가 여러 개인 경우 포함)
+def class_pattern(name):
+    return re.compile(rf"(^|\s){re.escape(name)}(\s|$)")
+
+
+# 페이지마다 실제로 읽는 부분만 트리로 만들기 위한 필터
+COURSE_LINKS = SoupStrainer("a", class_=class_pattern("course-link"))
+GENERAL_TABLE = SoupStrainer("table", class_=class_pattern("generaltable"))
+PROGRESS_TABLE = SoupStrainer("table", class_=class_pattern("user_progress_table"))
+
+
+# 설치된 BeautifulSoup 파서 목록 (테스트와 벤치마크에서 파서별 결과를 비교할 때 사용)
+def available_parsers():
+    if DEFAULT_HTML_PARSER == "lxml":
+        return ["html.parser", "lxml"]
+    return ["html.parser"]
+
+
+# 사용할 BeautifulSoup 파서 (설정이 없으면 lxml, 설치되어 있지 않으면 html.parser)
+def get_html_parser():
+    return getattr(settings, "PLATO_HTML_PARSER", None) or DEFAULT_HTML_PARSER
+
+
+def make_soup(html, parse_only, parser=None):
+    return BeautifulSoup(html, parser or get_html_parser(), parse_only=parse_only)
+
+
+# 날짜/시간 문자열 파싱
+def parse_datetime_string(text):
+    try:
+        if text == "-" or not text:
+            return None
+        text = text.replace('T', ' ')
+        return datetime.strptime(text, "%Y-%m-%d %H:%M")
+    except Exception as e:
+        print(f"Error occurred while parsing datetime string: {text}")
+        print(f"Error details: {str(e)}")
+        return None
+
+
+# 강좌 목록 HTML 파싱
+def parse_course_list(html, parser=None):
+    soup = make_soup(html, COURSE_LINKS, parser)
+    courses = []
+    for course in soup.select(".course-link"):
+        course_id = course["href"].split("?id=")[-1]
+        course_name = course.select_one(".course-title > h3").text
+        courses.append(Course(course_id, course_name))
+    return courses
+
+
+# 마감일시가 지나지 않은 자료만 남김
+def open_materials(materials, now=None):
+    if now is None:
+        now = datetime.now()
+    return [material for material in materials if material.due is None or now < material.due]
+
+
+# 퀴즈 목록 HTML 파싱 (now 기준으로 마감이 지난 퀴즈는 제외)
+def parse_quizzes(html, parser=None, now=None):
+    if now is None:
+        now = datetime.now()
+    quizzes = []
+    soup = make_soup(html, GENERAL_TABLE, parser)
+
+    for tr in soup.select(".generaltable > tbody > tr"):
+        tds = tr.select("td")
+        title = tds[1].text.strip()
+        due_str = tds[2].text.strip()
+        score = tds[3].text.strip()  # 점수 정보
+        due = parse_datetime_string(due_str)
+
+        if (due == None or now < due) and score == "":
+            quizzes.append(CourseMaterial(title, due))
+
+    return quizzes
+
+# 동영상 진도 HTML 파싱
+def parse_videos(html, parser=None):
+    videos = []
+    soup = make_soup(html, PROGRESS_TABLE, parser)
+
+    for tr in soup.select(".user_progress_table > tbody > tr"):
+        offset = 1
+        if len(tr.contents) == 4:
+            offset = 0
+        tds = tr.select("td")
+        title = tds[offset].text.strip()
+        watched = tds[offset + 3].text.strip()
+
+        if title != "" and watched != "O":
+            videos.append(CourseMaterial(title, None))
+
+    return videos
+
+# 과제 목록 HTML 파싱 (now 기준으로 마감이 지난 과제는 제외)
+def parse_homeworks(html, parser=None, now=None):
+    if now is None:
+        now = datetime.now()
+    homeworks = []
+    soup = make_soup(html, GENERAL_TABLE, parser)
+
+    for tr in soup.select(".generaltable > tbody > tr"):
+        tds = tr.select("td")
+        title = tds[1].text.strip()
+        due_str = tds[2].text.strip()
+        submitted = tds[3].text.strip()
+        due = parse_datetime_string(due_str)
+
+        if (due == None or now < due) and submitted == "미제출":
+            homeworks.append(CourseMaterial(title, due))
+
+    return homeworks
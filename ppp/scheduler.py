@@ -0,0 +1,122 @@
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+
+# 등록된 사용자의 PLATO 데이터를 주기적으로 미리 스크랩하는 스케줄러
+# 마감이 가까운 자료가 있는 사용자는 더 자주 갱신하고, 작업 시작 간격을 두어 요청이 몰리지 않게 함
+class RefreshScheduler:
+    def __init__(self):
+        self.interval = getattr(settings, "PLATO_PREFETCH_INTERVAL", 30 * 60)
+        self.urgent_interval = getattr(settings, "PLATO_PREFETCH_URGENT_INTERVAL", 5 * 60)
+        self.urgent_window = getattr(settings, "PLATO_PREFETCH_URGENT_WINDOW", 24 * 60 * 60)
+        self.spacing = getattr(settings, "PLATO_PREFETCH_SPACING", 2)
+        self.workers = getattr(settings, "PLATO_PREFETCH_WORKERS", 2)
+        self.enabled = getattr(settings, "PLATO_PREFETCH_ENABLED", True)
+
+        # (실행 시각, 다음 마감까지 남은 초, 순번, 키) 의 최소 힙
+        self._heap = []
+        self._users = {}
+        self._running = set()
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._executor = None
+
+    def register(self, username, password):
+        from .api import credential_key
+
+        if not self.enabled:
+            return
+        key = credential_key(username, password)
+        with self._cond:
+            if key not in self._users:
+                # 처음 등록된 사용자는 방금 스크랩했으므로 다음 주기에 갱신 (몰리지 않게 분산)
+                self._schedule(key, self._jitter(self.interval), self.urgent_window)
+            self._users[key] = (username, password)
+            self._start()
+
+    def unregister(self, username, password):
+        from .api import credential_key
+
+        with self._cond:
+            # 힙에 남은 항목은 꺼낼 때 무시됨
+            self._users.pop(credential_key(username, password), None)
+
+    def _jitter(self, seconds):
+        return seconds * random.uniform(0.9, 1.1)
+
+    def _schedule(self, key, delay, urgency):
+        heapq.heappush(self._heap, (time.monotonic() + delay, urgency, next(self._counter), key))
+        self._cond.notify()
+
+    def _start(self):
+        if self._thread is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="plato-prefetch")
+            self._thread = threading.Thread(target=self._run, name="plato-prefetch-scheduler", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._heap or self._heap[0][0] > time.monotonic():
+                    timeout = self._heap[0][0] - time.monotonic() if self._heap else None
+                    self._cond.wait(timeout)
+                _, _, _, key = heapq.heappop(self._heap)
+                if key not in self._users or key in self._running:
+                    continue
+                self._running.add(key)
+                username, password = self._users[key]
+            self._executor.submit(self._refresh, key, username, password)
+            # 다음 작업 시작까지 간격을 두어 PLATO 로 가는 요청을 분산
+            time.sleep(self.spacing)
+
+    def _refresh(self, key, username, password):
+        from .api import scrape_courses, store_result, resolve_concurrency
+
+        delay, urgency = self.interval, self.urgent_window
+        try:
+            courses = scrape_courses(username, password, resolve_concurrency(None))
+            if courses is None:
+                logger.warning("Prefetch login failed for %s; unregistering", username)
+                with self._cond:
+                    self._users.pop(key, None)
+                return
+            urgency = self._seconds_until_next_due(courses)
+            if urgency < self.urgent_window:
+                delay = self.urgent_interval
+            # 다음 갱신 전까지는 캐시된 결과로 응답할 수 있게 TTL 을 맞춤
+            store_result(username, key, courses, ttl=delay * 1.2)
+        except Exception:
+            logger.exception("Prefetch failed for %s", username)
+        finally:
+            close_old_connections()
+            with self._cond:
+                self._running.discard(key)
+                if key in self._users:
+                    self._schedule(key, self._jitter(delay), urgency)
+
+    def _seconds_until_next_due(self, courses):
+        now = datetime.now()
+        dues = [
+            material.due
+            for course in courses
+            for material in course.quizzes + course.homeworks
+            if material.due and material.due > now
+        ]
+        if not dues:
+            return self.urgent_window
+        return (min(dues) - now) / timedelta(seconds=1)
+
+
+refresh_scheduler = RefreshScheduler()
@@ -0,0 +1,157 @@
+import json
+import os
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+
+# 파일 잠금 (다른 프로세스가 잡고 있으면 풀릴 때까지 대기)
+def lock_file(file):
+    if fcntl is not None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+        return
+    file.seek(0)
+    while True:
+        try:
+            msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            # LK_LOCK 은 10초 동안 재시도한 뒤 실패하므로 계속 기다림
+            continue
+
+
+def unlock_file(file):
+    if fcntl is not None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+        return
+    file.seek(0)
+    msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class Flight:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+# 같은 키로 동시에 들어온 작업은 한 번만 실행하고 결과를 공유
+# - 같은 프로세스: 먼저 온 요청이 실행하는 동안 나머지는 기다렸다가 같은 결과를 받음
+# - 다른 프로세스: 키별 파일 잠금으로 순서를 정하고, 기다리는 동안 다른 프로세스가 남긴 결과 파일을 사용
+# 결과는 (본문 bytes, ETag) 또는 None 이어야 함
+# 결과 파일에는 응답 본문이 들어가므로 디렉터리는 0700, 파일은 0600 으로 만들고,
+# max_age 초가 지난 결과는 쓰지 않으며 그동안 쓰지 않은 잠금/결과 파일은 정리함
+class SingleFlight:
+    def __init__(self, directory, max_age=5 * 60):
+        self.directory = directory
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._flights = {}
+        self._directory_ready = False
+        self._pruned_at = 0
+
+    def do(self, key, func):
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = Flight()
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = self._do_locked(key, func)
+            return flight.result
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.event.set()
+
+    def _do_locked(self, key, func):
+        self._prepare_directory()
+        self._prune()
+        lock_path = os.path.join(self.directory, f"{key}.lock")
+        result_path = os.path.join(self.directory, f"{key}.json")
+        requested_at = time.time()
+
+        fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        with os.fdopen(fd, "r+b") as lock:
+            lock_file(lock)
+            try:
+                # 마지막으로 잠금을 잡은 시각을 남겨 쓰고 있는 잠금 파일은 정리되지 않게 함
+                os.utime(lock_path)
+                # 기다리는 동안 다른 프로세스가 같은 작업을 끝냈으면 그 결과를 사용
+                shared = self._read_result(result_path, requested_at)
+                if shared is not None:
+                    return shared
+                result = func()
+                if result is not None:
+                    self._write_result(result_path, result)
+                return result
+            finally:
+                unlock_file(lock)
+
+    # 디렉터리를 만들고 다른 사용자가 읽을 수 없도록 권한을 맞춤 (인스턴스마다 한 번)
+    def _prepare_directory(self):
+        if self._directory_ready:
+            return
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        os.chmod(self.directory, 0o700)
+        self._directory_ready = True
+
+    # max_age 초 동안 쓰지 않은 잠금/결과/임시 파일 삭제 (max_age 마다 한 번)
+    def _prune(self):
+        now = time.time()
+        with self._lock:
+            if now - self._pruned_at < self.max_age:
+                return
+            self._pruned_at = now
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if not entry.name.endswith((".lock", ".json", ".tmp")):
+                    continue
+                try:
+                    if entry.stat().st_mtime < now - self.max_age:
+                        os.remove(entry.path)
+                except OSError:
+                    pass
+
+    def _read_result(self, path, newer_than):
+        try:
+            mtime = os.path.getmtime(path)
+            if mtime < newer_than or mtime < time.time() - self.max_age:
+                return None
+            with open(path, encoding="utf-8") as file:
+                data = json.load(file)
+            return data["body"].encode(), data["etag"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _write_result(self, path, result):
+        body, etag = result
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            json.dump({"body": body.decode(), "etag": etag}, file)
+        os.replace(temp_path, path)
+
+
+singleflight = SingleFlight(
+    getattr(settings, "PLATO_SINGLEFLIGHT_DIR", None) or os.path.join(tempfile.gettempdir(), "plato-singleflight"),
+    getattr(settings, "PLATO_SINGLEFLIGHT_MAX_AGE", 5 * 60),
+)
@@ -0,0 +1,286 @@
+import hashlib
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+
+from .models import PlatoUser, PlatoCourse, PlatoMaterial, PlatoChange
+from .parsers import Course, CourseMaterial, open_materials
+
+# Course 속성 이름과 PlatoMaterial.kind 의 대응
+MATERIAL_KINDS = (
+    ("quizzes", PlatoMaterial.QUIZ),
+    ("videos", PlatoMaterial.VIDEO),
+    ("homeworks", PlatoMaterial.HOMEWORK),
+)
+
+
+# PLATO 는 한국 시간(naive)을 쓰므로 저장 시 현재 시간대 기준으로 변환
+def to_db_datetime(value):
+    if value is None or timezone.is_aware(value):
+        return value
+    return timezone.make_aware(value)
+
+
+def from_db_datetime(value):
+    if value is None:
+        return None
+    return timezone.localtime(value).replace(tzinfo=None)
+
+
+# SQLite 는 쓰기를 하나씩만 처리하므로 같은 프로세스의 저장은 여기서 순서대로 실행
+# (일괄 갱신/미리 갱신 스레드가 동시에 저장하다 잠금 오류가 나지 않게 함)
+_write_lock = threading.Lock()
+
+
+# 스크랩한 강좌 목록을 저장 (바뀐 행만 추가/수정/삭제)
+def save_courses(username, credential_key, courses):
+    with _write_lock:
+        return _save_courses(username, credential_key, courses)
+
+
+@transaction.atomic
+def _save_courses(username, credential_key, courses):
+    user, _ = PlatoUser.objects.get_or_create(
+        username=username, defaults={"credential_key": credential_key}
+    )
+    user.credential_key = credential_key
+    # 이번 저장에서 바뀐 자료는 이 리비전으로 변경 기록에 남김
+    revision = user.revision + 1
+    changes = []
+
+    # 같은 제목의 자료가 여러 개일 수 있으므로 (강좌, 종류, 제목, 순번) 으로 구분
+    # 강좌가 삭제되면 자료도 CASCADE 로 삭제되므로 삭제 기록을 남기기 위해 먼저 불러옴
+    stored_materials = {}
+    seen = Counter()
+    for material in user.materials.select_related("course").order_by("position"):
+        key = (material.course.course_id, material.kind, material.title)
+        seen[key] += 1
+        stored_materials[key + (seen[key],)] = material
+
+    stored_courses = {course.course_id: course for course in user.courses.all()}
+    records = {}
+    changed_courses = []
+    renamed_courses = set()
+    for position, course in enumerate(courses):
+        stored = stored_courses.pop(course.course_id, None)
+        if stored is None:
+            stored = PlatoCourse.objects.create(
+                user=user, course_id=course.course_id, course_name=course.course_name, position=position
+            )
+        elif stored.course_name != course.course_name or stored.position != position:
+            if stored.course_name != course.course_name:
+                renamed_courses.add(course.course_id)
+            stored.course_name = course.course_name
+            stored.position = position
+            changed_courses.append(stored)
+        records[course.course_id] = stored
+
+    if changed_courses:
+        PlatoCourse.objects.bulk_update(changed_courses, ["course_name", "position"])
+    if stored_courses:
+        # 더 이상 수강하지 않는 강좌 (자료는 CASCADE 로 함께 삭제)
+        PlatoCourse.objects.filter(pk__in=[course.pk for course in stored_courses.values()]).delete()
+
+    created_materials = []
+    changed_materials = []
+    seen = Counter()
+    for course in courses:
+        items = [(kind, material) for attr, kind in MATERIAL_KINDS for material in getattr(course, attr)]
+        for position, (kind, material) in enumerate(items):
+            key = (course.course_id, kind, material.title)
+            seen[key] += 1
+            due = to_db_datetime(material.due)
+            stored = stored_materials.pop(key + (seen[key],), None)
+            if stored is None:
+                created_materials.append(PlatoMaterial(
+                    user=user, course=records[course.course_id], kind=kind,
+                    title=material.title, due=due, position=position, revision=revision,
+                ))
+                changes.append(change_record(
+                    user, revision, PlatoChange.ADDED, key + (seen[key],), course.course_name, due
+                ))
+            elif stored.due != due or course.course_id in renamed_courses:
+                # 마감일시나 과목명이 바뀐 자료 (순서만 바뀐 것은 변경 기록에 남기지 않음)
+                stored.due = due
+                stored.position = position
+                stored.revision = revision
+                changed_materials.append(stored)
+                changes.append(change_record(
+                    user, revision, PlatoChange.UPDATED, key + (seen[key],), course.course_name, due
+                ))
+            elif stored.position != position:
+                stored.position = position
+                changed_materials.append(stored)
+
+    if created_materials:
+        PlatoMaterial.objects.bulk_create(created_materials)
+    if changed_materials:
+        PlatoMaterial.objects.bulk_update(changed_materials, ["due", "position", "revision"])
+    # 이번에 가져오지 못한 자료 종류는 기존 행을 그대로 둠
+    missing = {
+        (course.course_id, kind)
+        for course in courses
+        for attr, kind in MATERIAL_KINDS
+        if attr in course.missing
+    }
+    stored_materials = {key: material for key, material in stored_materials.items() if key[:2] not in missing}
+    if stored_materials:
+        # 완료했거나 마감이 지나 목록에서 사라진 자료
+        PlatoMaterial.objects.filter(pk__in=[material.pk for material in stored_materials.values()]).delete()
+        for key, material in stored_materials.items():
+            changes.append(change_record(
+                user, revision, PlatoChange.REMOVED, key, material.course.course_name, material.due
+            ))
+
+    update_fields = ["credential_key", "refreshed_at"]
+    if changes:
+        PlatoChange.objects.bulk_create(changes)
+        # 오래된 변경 기록은 지움 (그보다 이전 토큰으로 요청하면 전체를 다시 받음)
+        PlatoChange.objects.filter(user=user, revision__lte=revision - change_retention()).delete()
+        user.revision = revision
+        update_fields.append("revision")
+    user.refreshed_at = timezone.now()
+    user.save(update_fields=update_fields)
+    return {
+        "created": len(created_materials),
+        "updated": len(changed_materials),
+        "deleted": len(stored_materials),
+    }
+
+
+# 사용자별로 남겨둘 변경 기록 리비전 수
+def change_retention():
+    return getattr(settings, "PLATO_CHANGE_RETENTION", 100)
+
+
+# 자료의 고유 id (강좌 id, 종류, 제목, 같은 제목 중 순번으로 만든 해시)
+def item_id(key):
+    return hashlib.sha1("\0".join(map(str, key)).encode()).hexdigest()[:16]
+
+
+# 변경 기록 행 (key 는 (강좌 id, 종류, 제목, 순번))
+def change_record(user, revision, op, key, course_name, due):
+    course_id, kind, title, occurrence = key
+    return PlatoChange(
+        user=user, revision=revision, op=op, item_id=item_id(key),
+        course_id=course_id, course_name=course_name, kind=kind, title=title, due=due,
+    )
+
+
+# 토큰(리비전) 이후 바뀐 자료 (저장된 적 없거나 인증 실패 시 None)
+# 토큰이 없거나 변경 기록보다 오래됐으면 reset 과 함께 현재 자료 전체를 반환
+def load_changes(username, credential_key, since):
+    user = PlatoUser.objects.filter(username=username).first()
+    if user is None or user.refreshed_at is None or not constant_time_compare(user.credential_key, credential_key):
+        return None
+
+    try:
+        since = int(since)
+    except (TypeError, ValueError):
+        since = None
+    if since is None or since > user.revision or since < user.revision - change_retention():
+        return {"token": str(user.revision), "reset": True, "items": load_items(user)}
+
+    # 같은 자료가 여러 번 바뀌었으면 마지막 상태만 보냄 (토큰 이후 추가된 자료는 계속 added)
+    latest = {}
+    for change in user.changes.filter(revision__gt=since).order_by("revision", "pk"):
+        first_op = latest[change.item_id][0] if change.item_id in latest else change.op
+        latest[change.item_id] = (first_op, change)
+
+    delta = {"token": str(user.revision), "reset": False, "added": [], "updated": [], "removed": []}
+    for first_op, change in latest.values():
+        if change.op == PlatoChange.REMOVED:
+            delta["removed"].append(change.item_id)
+        else:
+            op = PlatoChange.ADDED if first_op == PlatoChange.ADDED else PlatoChange.UPDATED
+            delta[op].append(item_record(
+                change.item_id, change.course_id, change.course_name,
+                change.kind, change.title, change.due, change.revision,
+            ))
+    return delta
+
+
+# 현재 저장된 자료 전체를 강좌/자료 순서대로 변환
+def load_items(user):
+    items = []
+    seen = Counter()
+    for material in user.materials.select_related("course").order_by("course__position", "position"):
+        key = (material.course.course_id, material.kind, material.title)
+        seen[key] += 1
+        items.append(item_record(
+            item_id(key + (seen[key],)), material.course.course_id, material.course.course_name,
+            material.kind, material.title, material.due, material.revision,
+        ))
+    return items
+
+
+def item_record(item_id, course_id, course_name, kind, title, due, revision):
+    return {
+        "id": item_id,
+        "course_id": course_id,
+        "course_name": course_name,
+        "kind": kind,
+        "title": title,
+        "due": from_db_datetime(due),
+        "rev": revision,
+    }
+
+
+# 마감일시가 [start, end) 인 자료를 마감 순으로 변환 (due 인덱스 범위 조회)
+def due_records(materials, start, end):
+    materials = (
+        materials.filter(due__gte=to_db_datetime(start), due__lt=to_db_datetime(end))
+        .select_related("course", "user")
+        .order_by("due", "pk")
+    )
+    return [
+        {
+            "username": material.user.username,
+            "course_id": material.course.course_id,
+            "course_name": material.course.course_name,
+            "kind": material.kind,
+            "title": material.title,
+            "due": from_db_datetime(material.due),
+        }
+        for material in materials
+    ]
+
+
+# 한 사용자의 마감 임박 자료 (저장된 적 없거나 인증 실패 시 None)
+def load_due(username, credential_key, start, end):
+    user = PlatoUser.objects.filter(username=username).first()
+    if user is None or user.refreshed_at is None or not constant_time_compare(user.credential_key, credential_key):
+        return None
+    return due_records(user.materials.all(), start, end)
+
+
+# 모든 사용자의 마감 임박 자료 (알림 발송용)
+def load_due_all(start, end):
+    return due_records(PlatoMaterial.objects.all(), start, end)
+
+
+# 저장된 강좌 목록을 api.Course 객체로 불러옴 (저장된 적 없거나 인증 실패 시 None)
+# 저장한 뒤 마감이 지난 퀴즈/과제는 스크랩 결과와 같게 제외
+def load_courses(username, credential_key):
+    user = PlatoUser.objects.filter(username=username).first()
+    if user is None or user.refreshed_at is None or not constant_time_compare(user.credential_key, credential_key):
+        return None
+
+    courses = {}
+    for stored in user.courses.all():
+        courses[stored.pk] = Course(stored.course_id, stored.course_name)
+
+    attrs = {kind: attr for attr, kind in MATERIAL_KINDS}
+    for material in user.materials.order_by("course__position", "position"):
+        course = courses[material.course_id]
+        getattr(course, attrs[material.kind]).append(
+            CourseMaterial(material.title, from_db_datetime(material.due))
+        )
+    for course in courses.values():
+        course.quizzes = open_materials(course.quizzes)
+        course.homeworks = open_materials(course.homeworks)
+    return list(courses.values())
@@ -0,0 +1,140 @@
+import re
+import threading
+import time
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit
+
+FIXTURE_DIR = Path(__file__).resolve().parent / "fixtures" / "plato"
+
+# 경로별로 돌려줄 저장된 PLATO 페이지
+FIXTURE_PAGES = {
+    "/mod/quiz/index.php": "quiz_index.html",
+    "/mod/assign/index.php": "assign_index.html",
+    "/report/ubcompletion/user_progress_a.php": "user_progress.html",
+}
+
+SESSION_COOKIE = "MoodleSession"
+
+
+def load_fixture(name):
+    return (FIXTURE_DIR / name).read_text(encoding="utf-8")
+
+
+# 저장된 메인 페이지의 강좌 항목을 복제해 강좌가 course_count 개인 메인 페이지 생성
+def build_main_page(course_count):
+    html = load_fixture("main.html")
+    items = re.findall(r"\s*<li class=\"course_label_re_\d+\">.*?</li>", html, re.S)
+    courses = []
+    for index in range(course_count):
+        item = items[index % len(items)]
+        courses.append(re.sub(r"\?id=\d+", f"?id={100000 + index}", item))
+    return html.replace("".join(items), "".join(courses))
+
+
+# plato.pusan.ac.kr 흉내를 내는 로컬 HTTP 서버 (요청마다 latency 초 지연, 경로별 추가 지연은 page_latency)
+class PlatoStubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, course_count=3, latency=0.0, address=("127.0.0.1", 0), page_latency=None):
+        super().__init__(address, PlatoStubHandler)
+        self.latency = latency
+        self.page_latency = page_latency or {}
+        self.main_page = build_main_page(course_count).encode()
+        self.pages = {path: load_fixture(name).encode() for path, name in FIXTURE_PAGES.items()}
+        self.request_count = 0
+        self.login_count = 0
+        self.sessions = set()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name="plato-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+class PlatoStubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def begin(self):
+        with self.server._lock:
+            self.server.request_count += 1
+        delay = self.server.latency + self.server.page_latency.get(urlsplit(self.path).path, 0)
+        if delay:
+            time.sleep(delay)
+
+    def session_id(self):
+        cookie = SimpleCookie(self.headers.get("Cookie", ""))
+        morsel = cookie.get(SESSION_COOKIE)
+        return morsel.value if morsel else None
+
+    def send_body(self, body, headers=()):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def redirect(self, path, headers=()):
+        self.send_response(303)
+        self.send_header("Location", self.server.url + path)
+        self.send_header("Content-Length", "0")
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+
+    def do_POST(self):
+        self.begin()
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        path = urlsplit(self.path).path
+        if path != "/login/index.php":
+            self.send_error(404)
+            return
+
+        # 아이디/비밀번호와 관계없이 로그인 성공 처리 후 메인으로 이동
+        with self.server._lock:
+            self.server.login_count += 1
+            session_id = f"stub{self.server.login_count}"
+            self.server.sessions.add(session_id)
+        self.redirect("", [("Set-Cookie", f"{SESSION_COOKIE}={session_id}; Path=/")])
+
+    def do_GET(self):
+        self.begin()
+        path = urlsplit(self.path).path
+        if path == "/login/index.php":
+            self.send_body(b"<html><body><form id=\"login\"></form></body></html>")
+            return
+        if self.session_id() not in self.server.sessions:
+            # 로그인하지 않은 요청은 PLATO 처럼 로그인 페이지로 보냄
+            self.redirect("login/index.php")
+            return
+        if path == "/":
+            self.send_body(self.server.main_page)
+        elif path in self.server.pages:
+            self.send_body(self.server.pages[path])
+        else:
+            self.send_error(404)
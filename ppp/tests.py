@@ -1,3 +1,656 @@
-from django.test import TestCase
+import json
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from io import StringIO
+from types import SimpleNamespace
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import force_authenticate
+
+from .api import (
+    STREAM_CONTENT_TYPES, BatchRefreshView, DueView, JobView, MetricsView, TestView, credential_key, page_cache,
+    parse_page, result_cache, session_cache,
+)
+from .aio import AsyncTestView, iterate_in_thread
+from .encoding import msgpack
+from .governor import RequestGovernor, governor
+from .metrics import metrics
+from .parsers import (
+    Course, CourseMaterial, available_parsers, parse_course_list, parse_quizzes, parse_videos, parse_homeworks,
+)
+from .scheduler import refresh_scheduler
+from .singleflight import SingleFlight
+from .store import load_changes, load_courses, save_courses
+from .stub_server import PlatoStubServer, load_fixture
+from .transport import _async_transports
+
+# 스텁 서버를 상대로 하는 테스트는 앞선 테스트가 쓴 요청 수와 관계없이 바로 요청을 보내도록 속도 제한을 풂
+def lift_rate_limit(testcase):
+    saved = (governor.rate, governor.burst, governor.limit)
+    governor.rate = governor.burst = governor.tokens = 1e9
+
+    # 앞선 테스트의 느린 응답으로 줄어든 동시 요청 한도도 되돌림
+    def restore():
+        governor.rate, governor.burst, governor.limit = saved
+        governor.tokens = governor.burst
+
+    testcase.addCleanup(restore)
+
+
+# 저장된 PLATO 페이지를 모든 파서 백엔드로 파싱해 결과가 같은지 확인
+class ParserFixtureTests(SimpleTestCase):
+    def assertMaterials(self, materials, expected):
+        self.assertEqual([(material.title, material.due) for material in materials], expected)
+
+    def test_course_list(self):
+        for parser in available_parsers():
+            with self.subTest(parser=parser):
+                courses = parse_course_list(load_fixture("main.html"), parser)
+                self.assertEqual(
+                    [(course.course_id, course.course_name) for course in courses],
+                    [
+                        ("148201", "자료구조 (CB1500200-062)"),
+                        ("148377", "운영체제 (CB1500230-061)"),
+                        ("150912", "대학글쓰기 (GE1100012-031)"),
+                    ],
+                )
+
+    def test_quizzes(self):
+        for parser in available_parsers():
+            with self.subTest(parser=parser):
+                self.assertMaterials(parse_quizzes(load_fixture("quiz_index.html"), parser), [
+                    ("중간 대비 퀴즈", datetime(2099, 10, 20, 23, 59)),
+                    ("연습 퀴즈", None),
+                ])
+
+    def test_videos(self):
+        for parser in available_parsers():
+            with self.subTest(parser=parser):
+                self.assertMaterials(parse_videos(load_fixture("user_progress.html"), parser), [
+                    ("1-2 배열과 포인터", None),
+                    ("2-1 연결 리스트", None),
+                ])
+
+    def test_homeworks(self):
+        for parser in available_parsers():
+            with self.subTest(parser=parser):
+                self.assertMaterials(parse_homeworks(load_fixture("assign_index.html"), parser), [
+                    ("이진 탐색 트리", datetime(2099, 10, 27, 23, 59)),
+                    ("해시 테이블 보고서", None),
+                ])
+
+
+# 테스트마다 캐시를 비우고 로컬 스텁 서버를 띄워 PLATO_URL 로 지정
+class StubServerMixin:
+    page_latency = None
+
+    def setUp(self):
+        result_cache.clear()
+        session_cache.clear()
+        page_cache.clear()
+        self.server = PlatoStubServer(course_count=2, page_latency=self.page_latency).start()
+        self.addCleanup(self.server.stop)
+        settings_override = override_settings(PLATO_URL=self.server.url)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        lift_rate_limit(self)
+
+    def get(self, headers=None, **params):
+        params = {"username": "student", "password": "secret", **params}
+        return TestView.as_view()(RequestFactory().get("/v1/test/", params, **(headers or {})))
+
+
+# 로컬 스텁 서버를 상대로 /v1/test/ 전체 흐름 확인
+class TestViewStubServerTests(StubServerMixin, TestCase):
+    def test_scrapes_all_courses_in_order(self):
+        response = self.get(concurrency=4)
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content)["data"]
+        self.assertEqual([course["course_name"] for course in data], [
+            "자료구조 (CB1500200-062)",
+            "운영체제 (CB1500230-061)",
+        ])
+        self.assertEqual(data[0]["quizzes"], [
+            {"title": "중간 대비 퀴즈", "due": "2099-10-20 23:59:00"},
+            {"title": "연습 퀴즈"},
+        ])
+        self.assertEqual(data[0]["videos"], [{"title": "1-2 배열과 포인터"}, {"title": "2-1 연결 리스트"}])
+
+    def test_cached_result_and_etag(self):
+        first = self.get()
+        requests_after_first = self.server.request_count
+
+        second = self.get(headers={"HTTP_IF_NONE_MATCH": first["ETag"]})
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(self.server.request_count, requests_after_first)
+
+    def test_unchanged_pages_are_not_parsed_again(self):
+        first = self.get(concurrency=4)
+        metrics.reset()
+        second = self.get(concurrency=4, refresh=1)
+        self.assertEqual(second.content, first.content)
+        phases = metrics.snapshot()["phases"]
+        self.assertNotIn("parse_assign_index", phases)
+        self.assertEqual(phases["parse_assign_index_cached"]["count"], 2)
+
+    @skipUnless(msgpack, "msgpack 이 설치되어 있지 않음")
+    def test_msgpack_response(self):
+        json_response = self.get()
+        response = self.get(headers={"HTTP_ACCEPT": "application/msgpack"})
+        self.assertEqual(response["Content-Type"], "application/msgpack")
+        self.assertNotEqual(response["ETag"], json_response["ETag"])
+        self.assertEqual(msgpack.unpackb(response.content), json.loads(json_response.content))
+
+    def test_change_feed(self):
+        first = json.loads(self.get(since="").content)
+        self.assertTrue(first["reset"])
+        self.assertEqual(len({item["id"] for item in first["items"]}), len(first["items"]))
+
+        second = json.loads(self.get(since=first["token"]).content)
+        self.assertEqual(second, {"token": first["token"], "reset": False, "added": [], "updated": [], "removed": []})
+
+    def test_selected_types_and_courses(self):
+        requests_before = self.server.request_count
+        response = self.get(types="homework", course_ids="100001")
+        data = json.loads(response.content)["data"]
+        self.assertEqual([course["course_name"] for course in data], ["운영체제 (CB1500230-061)"])
+        self.assertEqual(set(data[0]), {"course_name", "homeworks"})
+        # 로그인, 메인, 과제 목록 한 페이지씩만 요청
+        self.assertLessEqual(self.server.request_count - requests_before, 4)
+
+    def stream(self, stream_format, **params):
+        response = self.get(stream=stream_format, **params)
+        self.assertEqual(response["Content-Type"], STREAM_CONTENT_TYPES[stream_format])
+        content = b"".join(response.streaming_content).decode()
+        if stream_format == "sse":
+            events = []
+            for block in content.strip().split("\n\n"):
+                event, data = block.split("\n")
+                events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+            return events
+        return [(line["event"], line["data"]) for line in map(json.loads, content.splitlines())]
+
+    def test_stream_ndjson(self):
+        events = self.stream("ndjson", concurrency=4)
+        self.assertEqual([event for event, data in events], ["course", "course", "done"])
+        self.assertEqual(
+            sorted(data["course_name"] for event, data in events[:2]),
+            ["운영체제 (CB1500230-061)", "자료구조 (CB1500200-062)"],
+        )
+        self.assertEqual(events[-1][1], {"count": 2, "partial": False})
+
+        # 스트림이 끝나면 DB 와 응답 캐시에 저장되어 다음 요청은 PLATO 에 요청하지 않음
+        self.assertEqual(len(load_courses("student", credential_key("student", "secret"))), 2)
+        requests_after_stream = self.server.request_count
+        self.assertEqual(self.get().status_code, 200)
+        self.assertEqual(self.server.request_count, requests_after_stream)
+
+    def test_stream_sse(self):
+        events = self.stream("sse")
+        self.assertEqual([event for event, data in events], ["course", "course", "done"])
+        self.assertFalse(events[-1][1]["partial"])
+
+    def test_stream_cached(self):
+        data = json.loads(self.get().content)["data"]
+        requests_after_first = self.server.request_count
+        events = self.stream("ndjson")
+        self.assertEqual(self.server.request_count, requests_after_first)
+        self.assertEqual([data for event, data in events[:-1]], data)
+        self.assertEqual(events[-1], ("done", {"cached": True}))
+
+    def test_stream_error(self):
+        with mock.patch("ppp.api.store_result", side_effect=RuntimeError("disk full")):
+            events = self.stream("ndjson")
+        self.assertEqual(events[-1], ("error", {"error": "내부 서버 오류", "details": "disk full"}))
+
+    def test_prefetch_opt_out_on_cache_hit(self):
+        self.addCleanup(refresh_scheduler.unregister, "student", "secret")
+        key = credential_key("student", "secret")
+        self.get(prefetch=1)
+        self.assertIn(key, refresh_scheduler._users)
+
+        # 스케줄러가 채운 캐시로 응답하더라도 prefetch=0 이면 등록 해제
+        requests_before = self.server.request_count
+        self.get(prefetch=0)
+        self.assertEqual(self.server.request_count, requests_before)
+        self.assertNotIn(key, refresh_scheduler._users)
+
+    def test_unknown_types(self):
+        response = self.get(types="exam")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("homework", json.loads(response.content)["valid_types"])
+        self.assertEqual(self.get(types="homework,exam").status_code, 400)
+        self.assertEqual(self.server.request_count, 0)
+
+
+# 느린 페이지는 시간 제한 안에서 빠진 것으로 표시하고 나머지 결과만 응답
+@override_settings(PLATO_PAGE_BUDGET=0.3, PLATO_HEDGE_AFTER=0.1)
+class TestViewPartialResultTests(StubServerMixin, TestCase):
+    page_latency = {"/report/ubcompletion/user_progress_a.php": 2}
+
+    def test_slow_pages_are_marked_missing(self):
+        response = self.get(concurrency=4)
+        self.assertEqual(response.status_code, 200)
+        payload = json.loads(response.content)
+        self.assertTrue(payload["partial"])
+        for course in payload["data"]:
+            self.assertEqual(course["missing"], ["videos"])
+            self.assertNotIn("videos", course)
+            self.assertEqual(len(course["homeworks"]), 2)
+
+    @override_settings(PLATO_SCRAPE_BUDGET=1)
+    def test_serial_scrape_respects_budget(self):
+        started = time.monotonic()
+        response = self.get(concurrency=1)
+        self.assertLess(time.monotonic() - started, 1.8)
+        payload = json.loads(response.content)
+        self.assertTrue(payload["partial"])
+        self.assertIn("videos", payload["data"][0]["missing"])
+
+    def test_partial_result_is_not_cached(self):
+        # 일부가 빠진 결과는 캐시하지 않으므로 다시 요청하면 다시 스크랩함
+        first = self.get(concurrency=4)
+        requests_after_first = self.server.request_count
+        second = self.get(concurrency=4, headers={"HTTP_IF_NONE_MATCH": first["ETag"]})
+        self.assertEqual(second.status_code, 304)
+        self.assertGreater(self.server.request_count, requests_after_first)
+
+
+# 다른 스레드가 따로 DB 연결을 써서 저장하는 경우는 TransactionTestCase 사용
+class StubServerTransactionTestCase(StubServerMixin, TransactionTestCase):
+    pass
+
+
+# /v1/test/async/ (스크랩 결과를 작업 스레드에서 저장하므로 TransactionTestCase 사용)
+class AsyncTestViewTests(StubServerTransactionTestCase):
+    page_latency = {"/mod/assign/index.php": 0.3}
+
+    def get_async(self, **params):
+        params = {"username": "student", "password": "secret", **params}
+        return async_to_sync(AsyncTestView.as_view())(RequestFactory().get("/v1/test/async/", params))
+
+    def test_matches_sync_view(self):
+        self.assertEqual(self.get_async(concurrency=4).content, self.get(refresh=1, concurrency=4).content)
+        self.assertEqual(self.get_async(since="").content, self.get(since="").content)
+        self.assertEqual(self.get_async(types="exam").status_code, 400)
+
+    def test_stream(self):
+        response = self.get_async(stream="ndjson")
+        events = [json.loads(line)["event"] for line in b"".join(response.streaming_content).splitlines()]
+        self.assertEqual(events, ["course", "course", "done"])
+
+    def test_closes_transport_per_request(self):
+        for _ in range(3):
+            self.assertEqual(self.get_async(refresh=1).status_code, 200)
+        # async_to_sync 는 요청마다 새 이벤트 루프를 쓰므로 공유 전송 계층이 쌓이지 않아야 함
+        self.assertEqual(len(_async_transports), 0)
+
+    # 같은 요청이 동시에 들어오면 스크랩은 한 번만 실행
+    def test_concurrent_requests_share_one_scrape(self):
+        # 첫 요청은 로그인까지 하므로 로그인된 세션으로 한 번 스크랩할 때의 요청 수를 기준으로 씀
+        self.get_async(refresh=1)
+        requests_before = self.server.request_count
+        self.get_async(refresh=1)
+        single = self.server.request_count - requests_before
+
+        requests_before = self.server.request_count
+        responses = []
+        threads = [threading.Thread(target=lambda: responses.append(self.get_async(refresh=1))) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([response.status_code for response in responses], [200, 200])
+        self.assertEqual(responses[0].content, responses[1].content)
+        self.assertEqual(self.server.request_count - requests_before, single)
+
+
+# mode=job 은 작업 id 를 바로 응답하고, 결과는 /v1/jobs/<id>/ 로 조회
+@override_settings(PLATO_JOB_PROCESSES=False)
+class JobModeTests(StubServerTransactionTestCase):
+    def get_job(self, job_id, **params):
+        params = {"username": "student", "password": "secret", **params}
+        return JobView.as_view()(RequestFactory().get(f"/v1/jobs/{job_id}/", params), job_id=job_id)
+
+    def test_job_result(self):
+        request = RequestFactory().get("/v1/test/", {"username": "student", "password": "secret", "mode": "job"})
+        response = TestView.as_view()(request)
+        self.assertEqual(response.status_code, 202)
+        job_id = json.loads(response.content)["job_id"]
+        self.assertEqual(response["Location"], f"/v1/jobs/{job_id}/")
+
+        self.assertEqual(self.get_job(job_id, password="wrong").status_code, 404)
+        result = self.get_job(job_id, wait=10)
+        self.assertEqual(result.status_code, 200)
+        self.assertEqual(len(json.loads(result.content)["data"]), 2)
+
+
+# 여러 사용자를 한 번에 갱신하고 사용자별 결과와 처리량 통계를 응답
+class BatchRefreshTests(StubServerTransactionTestCase):
+    def post(self, data):
+        request = RequestFactory().post("/v1/batch/", json.dumps(data), content_type="application/json")
+        return BatchRefreshView.as_view()(request)
+
+    def test_batch_refresh(self):
+        users = [{"username": f"student{index}", "password": "secret"} for index in range(3)]
+        response = self.post({"users": users, "workers": 2})
+        self.assertEqual(response.status_code, 200)
+        payload = json.loads(response.content)
+        self.assertEqual([result["username"] for result in payload["results"]], ["student0", "student1", "student2"])
+        self.assertTrue(all(result["status"] == "ok" and result["courses"] == 2 for result in payload["results"]))
+        self.assertEqual(payload["stats"]["succeeded"], 3)
+        self.assertEqual(payload["stats"]["workers"], 2)
+        self.assertGreater(payload["stats"]["requests"], 0)
+
+    def test_invalid_users(self):
+        self.assertEqual(self.post({"users": "student"}).status_code, 400)
+        self.assertEqual(self.post([{"username": "student", "password": "secret"}]).status_code, 400)
+
+    @override_settings(PLATO_BATCH_MAX_USERS=2)
+    def test_too_many_users(self):
+        users = [{"username": f"student{index}", "password": "secret"} for index in range(3)]
+        self.assertEqual(self.post({"users": users}).status_code, 400)
+        self.assertEqual(self.server.request_count, 0)
+
+
+# 저장된 자료 중 마감이 within 이내인 것만 마감 순으로 응답
+class DueViewTests(TestCase):
+    def setUp(self):
+        now = timezone.localtime().replace(tzinfo=None)
+        course = Course("1", "자료구조")
+        course.quizzes = [CourseMaterial("퀴즈", now + timedelta(hours=30))]
+        course.videos = [CourseMaterial("동영상", None)]
+        course.homeworks = [CourseMaterial("과제 2", now + timedelta(hours=5)), CourseMaterial("과제 1", now + timedelta(hours=2))]
+        save_courses("student", credential_key("student", "secret"), [course])
+
+    def get(self, **params):
+        params = {"username": "student", "password": "secret", **params}
+        return DueView.as_view()(RequestFactory().get("/v1/due/", params))
+
+    def test_due_within(self):
+        data = json.loads(self.get(within="24h").content)["data"]
+        self.assertEqual([item["title"] for item in data], ["과제 1", "과제 2"])
+        self.assertEqual(data[0]["kind"], "homework")
+
+        data = json.loads(self.get(within="2d").content)["data"]
+        self.assertEqual([item["title"] for item in data], ["과제 1", "과제 2", "퀴즈"])
+
+    def test_wrong_password(self):
+        self.assertEqual(self.get(password="wrong").status_code, 404)
+
+    def test_load_courses_skips_past_due(self):
+        now = timezone.localtime().replace(tzinfo=None)
+        course = Course("1", "자료구조")
+        course.homeworks = [CourseMaterial("지난 과제", now - timedelta(hours=1)), CourseMaterial("과제", now + timedelta(hours=1))]
+        save_courses("student", credential_key("student", "secret"), [course])
+        courses = load_courses("student", credential_key("student", "secret"))
+        self.assertEqual([homework.title for homework in courses[0].homeworks], ["과제"])
+
+    def test_due_command(self):
+        output = StringIO()
+        call_command("plato_due", "--within", "24h", stdout=output)
+        items = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual([item["title"] for item in items], ["과제 1", "과제 2"])
+
+        with self.assertRaises(CommandError):
+            call_command("plato_due", "--within", "infh", stdout=StringIO())
+
+    def test_invalid_within(self):
+        for within in ("infh", "nanh", "-1d", "soon"):
+            self.assertEqual(self.get(within=within).status_code, 400)
+        # 너무 긴 기간은 최대 기간으로 맞춤
+        self.assertEqual(self.get(within="1e12").status_code, 200)
+
+
+# 지표 초기화는 POST 로, 관리자만 가능
+class MetricsViewTests(TestCase):
+    def post(self, user=None):
+        request = RequestFactory().post("/v1/metrics/")
+        if user is not None:
+            force_authenticate(request, user=user)
+        return MetricsView.as_view()(request)
+
+    def test_reset_requires_staff(self):
+        metrics.observe_phase("courses", 100)
+        self.assertEqual(self.post().status_code, 403)
+        self.assertEqual(self.post(User(username="student")).status_code, 403)
+        self.assertIn("courses", metrics.snapshot()["phases"])
+
+        response = self.post(User(username="admin", is_staff=True))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("courses", json.loads(response.content)["phases"])
+        self.assertEqual(metrics.snapshot()["phases"], {})
+
+    def test_get_does_not_reset(self):
+        metrics.observe_phase("courses", 100)
+        MetricsView.as_view()(RequestFactory().get("/v1/metrics/", {"reset": 1}))
+        self.assertIn("courses", metrics.snapshot()["phases"])
+
+
+# 리비전 토큰 이후 추가/수정/삭제된 자료만 돌려주는 변경 피드
+class ChangeFeedTests(TestCase):
+    def save(self, quizzes, homeworks):
+        course = Course("1", "자료구조")
+        course.quizzes = quizzes
+        course.homeworks = homeworks
+        save_courses("student", credential_key("student", "secret"), [course])
+        return load_changes("student", credential_key("student", "secret"), None)["token"]
+
+    def changes(self, since):
+        return load_changes("student", credential_key("student", "secret"), since)
+
+    def test_changes_since_token(self):
+        due = datetime(2099, 10, 20, 23, 59)
+        token = self.save(
+            [CourseMaterial("퀴즈", due)],
+            [CourseMaterial("과제 1", due), CourseMaterial("과제 2", None)],
+        )
+        reset = self.changes(None)
+        self.assertTrue(reset["reset"])
+        ids = {item["title"]: item["id"] for item in reset["items"]}
+        self.assertEqual(len(ids), 3)
+
+        later = datetime(2099, 10, 27, 23, 59)
+        homeworks = [CourseMaterial("과제 2", None), CourseMaterial("과제 3", due)]
+        new_token = self.save([CourseMaterial("퀴즈", later)], homeworks)
+        delta = self.changes(token)
+        self.assertEqual(delta["token"], new_token)
+        self.assertEqual([item["title"] for item in delta["added"]], ["과제 3"])
+        self.assertEqual([(item["id"], item["due"]) for item in delta["updated"]], [(ids["퀴즈"], later)])
+        self.assertEqual(delta["removed"], [ids["과제 1"]])
+
+        # 아무것도 바뀌지 않으면 토큰도 그대로
+        self.assertEqual(self.save([CourseMaterial("퀴즈", later)], homeworks), new_token)
+        self.assertEqual(self.changes(new_token)["added"], [])
+
+    def test_unknown_token_resets(self):
+        self.save([CourseMaterial("퀴즈", None)], [])
+        self.assertTrue(self.changes("999")["reset"])
+        self.assertIsNone(load_changes("student", "wrong", None))
+
+
+# 페이지 캐시는 마감일시로 거르지 않은 자료를 저장하고, 재사용할 때마다 마감이 지난 자료를 제외
+class PageCacheTests(SimpleTestCase):
+    def setUp(self):
+        page_cache.clear()
+        self.addCleanup(page_cache.clear)
+
+    def test_expired_materials_are_dropped_on_reuse(self):
+        now = datetime.now()
+        key = ("student", "1", "quizzes")
+        entry = (
+            hashlib.sha1(b"page").digest(),
+            {"If-None-Match": '"v1"'},
+            (CourseMaterial("지난 퀴즈", now - timedelta(minutes=1)), CourseMaterial("퀴즈", now + timedelta(hours=1))),
+        )
+        page_cache.set(key, entry)
+        for status_code in (200, 304):
+            res = SimpleNamespace(status_code=status_code, content=b"page", text="page", headers={})
+            self.assertEqual([quiz.title for quiz in parse_page(key, res, entry, None, "parse_quiz_index")], ["퀴즈"])
+
+
+# 같은 키의 동시 요청은 한 번만 실행되고 결과를 공유
+class SingleFlightTests(SimpleTestCase):
+    def test_concurrent_calls_share_one_run(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        flight = SingleFlight(directory.name)
+        calls = []
+
+        def run():
+            calls.append(1)
+            time.sleep(0.2)
+            return b"{}", '"etag"'
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(flight.do("key", run))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [(b"{}", '"etag"')] * 5)
+
+    def test_private_files_and_pruning(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "flights")
+        flight = SingleFlight(path, max_age=60)
+        flight.do("key", lambda: (b"{}", '"etag"'))
+
+        self.assertEqual(os.stat(path).st_mode & 0o777, 0o700)
+        for name in ("key.lock", "key.json"):
+            self.assertEqual(os.stat(os.path.join(path, name)).st_mode & 0o777, 0o600)
+
+        # max_age 가 지난 파일은 다음 호출 때 삭제됨
+        old = time.time() - 120
+        for name in ("key.lock", "key.json"):
+            os.utime(os.path.join(path, name), (old, old))
+        flight._pruned_at = 0
+        flight.do("other", lambda: None)
+        self.assertEqual(sorted(os.listdir(path)), ["other.lock"])
+
+
+# 조절기의 재시도/백오프, Retry-After, 동시 요청 한도 조절, 토큰 버킷
+class RequestGovernorTests(SimpleTestCase):
+    def setUp(self):
+        self.governor = RequestGovernor(
+            rate=1000, burst=1000, min_limit=2, max_limit=16, slow_response=1.0, retries=2, backoff=0.5
+        )
+        sleep = mock.patch("ppp.governor.time.sleep")
+        self.sleep = sleep.start()
+        self.addCleanup(sleep.stop)
+
+    def sender(self, *outcomes):
+        calls = []
+
+        def send():
+            outcome = outcomes[len(calls)]
+            calls.append(outcome)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        return send, calls
+
+    def response(self, status_code, **headers):
+        return SimpleNamespace(status_code=status_code, headers=headers)
+
+    def test_retries_server_errors_and_shrinks_limit(self):
+        initial = self.governor.limit
+        send, calls = self.sender(self.response(503), self.response(500), self.response(200))
+        self.assertEqual(self.governor.call(send).status_code, 200)
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(self.sleep.call_count, 2)
+        shrunk = initial * 0.7 * 0.7
+        self.assertAlmostEqual(self.governor.limit, shrunk + 1 / shrunk)
+        self.assertEqual(self.governor.in_flight, 0)
+
+    def test_retry_after(self):
+        send, calls = self.sender(self.response(429, **{"Retry-After": "7"}), self.response(200))
+        self.governor.call(send)
+        self.sleep.assert_called_once_with(7)
+        # 너무 긴 Retry-After 는 30초로 제한
+        self.assertEqual(self.governor.retry_delay(0, self.response(429, **{"Retry-After": "600"})), 30)
+
+    def test_returns_last_response_after_retries(self):
+        send, calls = self.sender(*[self.response(503)] * 3)
+        self.assertEqual(self.governor.call(send).status_code, 503)
+        self.assertEqual(len(calls), 3)
+
+    def test_retries_exceptions_and_raises_on_last_attempt(self):
+        send, calls = self.sender(ConnectionError(), self.response(200))
+        self.assertEqual(self.governor.call(send, ConnectionError).status_code, 200)
+        self.assertEqual(len(calls), 2)
+
+        send, calls = self.sender(*[ConnectionError()] * 3)
+        with self.assertRaises(ConnectionError):
+            self.governor.call(send, ConnectionError)
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(self.governor.in_flight, 0)
+        # 다시 시도하지 않는 예외는 바로 전달
+        send, calls = self.sender(ValueError())
+        with self.assertRaises(ValueError):
+            self.governor.call(send, ConnectionError)
+        self.assertEqual(len(calls), 1)
+
+    def test_limit_adapts_within_bounds(self):
+        for _ in range(20):
+            self.governor.in_flight += 1
+            self.governor.release(0.1, failed=True)
+        self.assertEqual(self.governor.limit, 2)
+        self.governor.in_flight += 1
+        self.governor.release(5.0, failed=False)
+        self.assertEqual(self.governor.limit, 2)
+
+        for _ in range(1000):
+            self.governor.in_flight += 1
+            self.governor.release(0.1, failed=False)
+        self.assertEqual(self.governor.limit, 16)
+        # 실패하지 않아도 느린 응답이면 한도를 줄임
+        self.governor.in_flight += 1
+        self.governor.release(5.0, failed=False)
+        self.assertAlmostEqual(self.governor.limit, 16 * 0.7)
+
+    def test_token_bucket_and_concurrency_limit(self):
+        governor = RequestGovernor(
+            rate=10, burst=1, min_limit=1, max_limit=1, slow_response=1.0, retries=0, backoff=0.5
+        )
+        self.assertEqual(governor.try_acquire(), 0)
+        # 동시 요청 한도(1)가 찼으면 잠깐 기다림
+        self.assertEqual(governor.try_acquire(), 0.01)
+        governor.release(0.1, failed=False)
+        # 토큰을 다 썼으면 토큰 하나가 찰 때까지 기다림 (초당 10개)
+        self.assertAlmostEqual(governor.try_acquire(), 0.1, places=2)
+
+    def test_call_async(self):
+        calls = []
+
+        async def send():
+            calls.append(1)
+            return self.response(503 if len(calls) == 1 else 200)
+
+        with mock.patch("ppp.governor.asyncio.sleep", mock.AsyncMock()) as sleep:
+            res = async_to_sync(self.governor.call_async)(send)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(calls), 2)
+        sleep.assert_awaited_once()
+
+
+# 동기 스트림을 ASGI 로 보낼 때 쓰는 비동기 이터레이터
+class IterateInThreadTests(SimpleTestCase):
+    def test_iterate_in_thread(self):
+        async def collect():
+            return [item async for item in iterate_in_thread(iter([b"a", b"b"]))]
+
+        self.assertEqual(async_to_sync(collect)(), [b"a", b"b"])
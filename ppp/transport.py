@@ -0,0 +1,59 @@
+import asyncio
+import weakref
+
+import httpx
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+# PLATO 인증서 검증 여부 (요청마다 따로 넘기지 않고 세션/전송 계층에서 한 번에 설정)
+def verify_ssl():
+    return getattr(settings, "PLATO_VERIFY_SSL", True)
+
+
+# 프로세스 전체가 같이 쓰는 연결 풀 (keep-alive 로 TCP/TLS 연결 재사용)
+# 쿠키는 세션마다 따로 가지므로 사용자별 로그인 상태는 섞이지 않음
+# 재시도는 governor 가 담당하므로 어댑터에서는 하지 않음
+http_adapter = HTTPAdapter(
+    pool_connections=getattr(settings, "PLATO_POOL_CONNECTIONS", 4),
+    pool_maxsize=getattr(settings, "PLATO_POOL_MAXSIZE", 64),
+    max_retries=0,
+)
+
+
+def configure_session(session):
+    session.mount("https://", http_adapter)
+    session.mount("http://", http_adapter)
+    session.verify = verify_ssl()
+    return session
+
+
+def create_async_transport():
+    return httpx.AsyncHTTPTransport(
+        verify=verify_ssl(),
+        http2=HTTP2_AVAILABLE and getattr(settings, "PLATO_HTTP2", False),
+        limits=httpx.Limits(
+            max_connections=getattr(settings, "PLATO_POOL_MAXSIZE", 64),
+            max_keepalive_connections=getattr(settings, "PLATO_POOL_MAXSIZE", 64),
+        ),
+    )
+
+
+# 비동기 클라이언트용 공유 전송 계층 (연결은 이벤트 루프에 묶이므로 루프마다 하나)
+# ASGI 서버처럼 이벤트 루프가 계속 유지될 때만 사용 (요청마다 새 루프를 만드는 경우는 닫히지 않고 쌓임)
+_async_transports = weakref.WeakKeyDictionary()
+
+
+def get_async_transport():
+    loop = asyncio.get_running_loop()
+    transport = _async_transports.get(loop)
+    if transport is None:
+        transport = create_async_transport()
+        _async_transports[loop] = transport
+    return transport
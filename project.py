@@ -45,7 +45,7 @@ def login(username, password):
 
     global session
     session = requests.session()
-    res = session.post(f"{plato_url}login/index.php", login_info, verify = False)
+    res = session.post(f"{plato_url}login/index.php", login_info)
 
     return res.url == plato_url
 
@@ -5,6 +5,9 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
+
+Serve with an ASGI server (e.g. ``uvicorn project.asgi:application``) so that
+the async ``/v1/test/async/`` endpoint can run many PLATO scrapes per process.
 """
 
 import os
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -123,3 +124,110 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# PLATO scraper
+# 스크랩할 PLATO 주소 (벤치마크용 로컬 스텁 서버 등으로 바꿀 수 있음)
+
+PLATO_URL = os.environ.get("PLATO_URL", "https://plato.pusan.ac.kr/")
+
+# 한 사용자 요청에서 동시에 보낼 PLATO 페이지 요청 수 (기본값 / 상한)
+
+PLATO_CONCURRENCY = 4
+
+PLATO_MAX_CONCURRENCY = 8
+
+# 로그인된 PLATO 세션 쿠키를 재사용하는 시간(초)과 최대 사용자 수
+PLATO_SESSION_TTL = 30 * 60
+
+PLATO_SESSION_CACHE_SIZE = 1000
+
+# /v1/test/ 응답을 사용자별로 캐시하는 시간(초)과 최대 사용자 수
+PLATO_RESULT_TTL = 5 * 60
+
+PLATO_RESULT_CACHE_SIZE = 1000
+
+# 강좌 페이지 HTML 해시와 파싱 결과를 캐시하는 시간(초)과 최대 페이지 수 (HTML 이 같으면 다시 파싱하지 않음)
+PLATO_PAGE_CACHE_TTL = 24 * 60 * 60
+
+PLATO_PAGE_CACHE_SIZE = 5000
+
+# 변경 피드(?since=<토큰>)용으로 사용자별로 남겨둘 변경 기록 리비전 수 (더 오래된 토큰은 전체를 다시 받음)
+PLATO_CHANGE_RETENTION = 100
+
+# /v1/due/?within= 로 조회할 수 있는 최대 기간(초)
+PLATO_DUE_MAX_WITHIN = 366 * 24 * 60 * 60
+
+# PLATO 페이지 파싱에 쓸 BeautifulSoup 파서 (None 이면 lxml, 없으면 html.parser)
+PLATO_HTML_PARSER = None
+
+# 백그라운드 미리 갱신 (prefetch=1 로 등록한 사용자만 대상)
+# 기본 갱신 주기, 마감 임박(URGENT_WINDOW 이내) 사용자의 갱신 주기, 작업 시작 간격(초), 동시 작업 수
+PLATO_PREFETCH_ENABLED = True
+
+PLATO_PREFETCH_INTERVAL = 30 * 60
+
+PLATO_PREFETCH_URGENT_INTERVAL = 5 * 60
+
+PLATO_PREFETCH_URGENT_WINDOW = 24 * 60 * 60
+
+PLATO_PREFETCH_SPACING = 2
+
+PLATO_PREFETCH_WORKERS = 2
+
+# PLATO 로 나가는 요청 조절 (프로세스 전체)
+# 초당 요청 수와 버스트, 동시 요청 수 자동 조절 범위, 느린 응답 기준(초), 재시도 횟수와 백오프(초), 요청 타임아웃(초)
+PLATO_RATE_LIMIT = 20
+
+PLATO_RATE_BURST = 40
+
+PLATO_CONCURRENCY_LIMIT_MIN = 4
+
+PLATO_CONCURRENCY_LIMIT_MAX = 64
+
+PLATO_SLOW_RESPONSE = 3.0
+
+PLATO_RETRIES = 2
+
+PLATO_RETRY_BACKOFF = 0.5
+
+PLATO_REQUEST_TIMEOUT = 15
+
+# 강좌 자료 스크랩 시간 제한(초): 전체, 페이지별, 같은 페이지를 한 번 더 요청(hedge)하기까지
+# 제한을 넘긴 자료는 "missing" 으로 표시하고 나머지 결과만 응답
+PLATO_SCRAPE_BUDGET = 20
+
+PLATO_PAGE_BUDGET = 10
+
+PLATO_HEDGE_AFTER = 3
+
+# 같은 사용자의 동시 스크랩을 여러 프로세스에서 하나로 합칠 때 쓰는 잠금/결과 파일 경로 (None 이면 임시 디렉터리)
+PLATO_SINGLEFLIGHT_DIR = None
+
+# 이 시간(초)보다 오래된 single-flight 결과 파일은 쓰지 않고, 오래 쓰지 않은 잠금/결과 파일은 삭제
+PLATO_SINGLEFLIGHT_MAX_AGE = 5 * 60
+
+# 작업 큐 모드(mode=job): 스크래퍼 작업 수, 작업을 별도 프로세스에서 실행할지 여부 (False 면 스레드),
+# 완료된 작업 보관 시간(초), 결과 조회 시 최대 대기 시간(초)
+PLATO_JOB_WORKERS = 2
+
+PLATO_JOB_PROCESSES = True
+
+PLATO_JOB_RETENTION = 60 * 60
+
+PLATO_JOB_MAX_WAIT = 30
+
+# 일괄 갱신(/v1/batch/, plato_refresh): 동시에 갱신할 최대 사용자 수,
+# /v1/batch/ 가 한 번에 받을 최대 사용자 수 (요청 안에서 바로 갱신하므로 작게 유지, 더 많으면 plato_refresh 사용)
+PLATO_BATCH_WORKERS = 8
+
+PLATO_BATCH_MAX_USERS = 20
+
+# PLATO 연결 풀 (프로세스 전체 공유): 인증서 검증, 호스트별 풀 수와 풀당 최대 연결 수, HTTP/2 사용 여부 (h2 설치 필요)
+PLATO_VERIFY_SSL = True
+
+PLATO_POOL_CONNECTIONS = 4
+
+PLATO_POOL_MAXSIZE = 64
+
+PLATO_HTTP2 = False
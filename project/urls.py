@@ -17,9 +17,15 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path
 
-from ppp.api import TestView
+from ppp.aio import AsyncTestView
+from ppp.api import BatchRefreshView, DueView, JobView, MetricsView, TestView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('v1/test/', TestView.as_view())
+    path('v1/test/', TestView.as_view()),
+    path('v1/test/async/', AsyncTestView.as_view()),
+    path('v1/due/', DueView.as_view()),
+    path('v1/jobs/<uuid:job_id>/', JobView.as_view()),
+    path('v1/batch/', BatchRefreshView.as_view()),
+    path('v1/metrics/', MetricsView.as_view())
 ]
\ No newline at end of file